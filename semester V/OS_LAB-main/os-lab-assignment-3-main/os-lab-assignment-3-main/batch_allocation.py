@@ -0,0 +1,245 @@
+"""
+Batch file allocation with per-request status
+
+Tasks 2 and 3 check and allocate one file at a time. The functions here
+take a whole batch of requests, either contiguous extents (start, length)
+or indexed block sets, validate them together and commit them in one go:
+
+* Range, bitmap and in-batch overlap checks run as whole-array NumPy
+  operations (a gather from the bitmap for block sets, a search over the
+  free extents for extents). Only requests that actually share blocks with
+  another request are then resolved one by one.
+* The result is a status per request (OK, INVALID, IN_USE, OVERLAP or
+  ABORTED). Requests count in order: a request that overlaps an earlier
+  request which was accepted gets OVERLAP, one that overlaps a rejected
+  request does not.
+* With ``atomic=True`` either every request is committed or none is, and
+  requests that were fine on their own are reported as ABORTED. Otherwise
+  the valid requests are committed and the rest are skipped (best effort).
+
+Without NumPy the same checks run as plain Python loops with the same
+results.
+"""
+
+import random
+import time
+from bisect import bisect_left
+from itertools import chain
+
+from block_map import BlockMap
+from inode import block_runs
+
+try:
+    import numpy as np
+except ImportError:  # the batch functions fall back to Python loops
+    np = None
+
+OK, INVALID, IN_USE, OVERLAP, ABORTED = range(5)
+STATUS_NAMES = {OK: 'ok', INVALID: 'invalid', IN_USE: 'in use', OVERLAP: 'overlap', ABORTED: 'aborted'}
+
+def summarize(status):
+    """Count of requests per status name"""
+    counts = {}
+    for code in status:
+        name = STATUS_NAMES[int(code)]
+        counts[name] = counts.get(name, 0) + 1
+    return counts
+
+def _overlaps_committed(starts, ends, start, end):
+    """Whether [start, end) overlaps a range in the sorted, disjoint
+    ``starts``/``ends`` lists"""
+    i = bisect_left(starts, start)
+    if i < len(starts) and starts[i] < end:
+        return True
+    return i > 0 and ends[i - 1] > start
+
+def _resolve_extents(status, candidates, starts, lengths):
+    """Accept or reject (OVERLAP) overlapping extents in request order"""
+    taken_starts, taken_ends = [], []
+    for i in sorted(candidates):
+        start, end = int(starts[i]), int(starts[i]) + int(lengths[i])
+        if _overlaps_committed(taken_starts, taken_ends, start, end):
+            status[i] = OVERLAP
+            continue
+        position = bisect_left(taken_starts, start)
+        taken_starts.insert(position, start)
+        taken_ends.insert(position, end)
+
+def _finish(status, atomic, commit):
+    """Commit the accepted requests, or none of them if ``atomic`` and any
+    request failed"""
+    if atomic:
+        if np is not None and isinstance(status, np.ndarray):
+            if (status != OK).any():
+                status[status == OK] = ABORTED
+                return status
+        elif any(code != OK for code in status):
+            status[:] = [ABORTED if code == OK else code for code in status]
+            return status
+    commit()
+    return status
+
+# Contiguous extents
+
+def allocate_extents(block_map, requests, atomic=False):
+    """Allocate a batch of (start, length) extents and return their status
+    (a NumPy uint8 array, or a list without NumPy)"""
+    if np is None:
+        return _allocate_extents_python(block_map, requests, atomic)
+
+    pairs = np.array(requests, dtype=np.int64).reshape(-1, 2)
+    starts, lengths = pairs[:, 0], pairs[:, 1]
+    ends = starts + lengths
+    status = np.zeros(len(pairs), dtype=np.uint8)
+
+    status[(lengths <= 0) | (starts < 0) | (ends > block_map.total_blocks)] = INVALID
+
+    # An extent is free if it lies inside one free extent
+    free = np.fromiter(chain.from_iterable(block_map.free_extents()), dtype=np.int64).reshape(-1, 2)
+    ok = np.flatnonzero(status == OK)
+    if len(free) == 0:
+        status[ok] = IN_USE
+    else:
+        containing = np.searchsorted(free[:, 0], starts[ok], side='right') - 1
+        found = np.maximum(containing, 0)
+        inside = (containing >= 0) & (ends[ok] <= free[found, 0] + free[found, 1])
+        status[ok[~inside]] = IN_USE
+
+    # Overlaps inside the batch: in start order, an extent that starts before
+    # the furthest end so far belongs to the same cluster as the one before
+    ok = np.flatnonzero(status == OK)
+    if len(ok) > 1:
+        order = ok[np.argsort(starts[ok], kind='stable')]
+        furthest = np.maximum.accumulate(ends[order])
+        joins_previous = starts[order[1:]] < furthest[:-1]
+        if joins_previous.any():
+            contested = np.zeros(len(order), dtype=bool)
+            contested[1:] |= joins_previous
+            contested[:-1] |= joins_previous
+            _resolve_extents(status, order[contested].tolist(), starts, lengths)
+
+    def commit():
+        accepted = np.flatnonzero(status == OK)
+        accepted = accepted[np.argsort(starts[accepted])]
+        block_map.allocate_runs(zip(starts[accepted].tolist(), lengths[accepted].tolist()))
+
+    return _finish(status, atomic, commit)
+
+def _allocate_extents_python(block_map, requests, atomic):
+    status = [OK] * len(requests)
+    taken_starts, taken_ends = [], []
+    for i, (start, length) in enumerate(requests):
+        end = start + length
+        if length <= 0 or start < 0 or end > block_map.total_blocks:
+            status[i] = INVALID
+        elif block_map.first_allocated(start, end) != -1:
+            status[i] = IN_USE
+        elif _overlaps_committed(taken_starts, taken_ends, start, end):
+            status[i] = OVERLAP
+        else:
+            position = bisect_left(taken_starts, start)
+            taken_starts.insert(position, start)
+            taken_ends.insert(position, end)
+
+    def commit():
+        block_map.allocate_runs(sorted(request for request, code in zip(requests, status) if code == OK))
+
+    return _finish(status, atomic, commit)
+
+# Indexed block sets
+
+def allocate_block_sets(block_map, block_sets, atomic=False):
+    """Allocate a batch of block sets (e.g. an index block plus its data
+    blocks per file) and return their status (a NumPy uint8 array, or a
+    list without NumPy). A set that lists a block twice is OVERLAP."""
+    if np is None:
+        return _allocate_block_sets_python(block_map, block_sets, atomic)
+
+    counts = np.fromiter(map(len, block_sets), dtype=np.int64, count=len(block_sets))
+    blocks = np.fromiter(chain.from_iterable(block_sets), dtype=np.int64, count=int(counts.sum()))
+    owners = np.repeat(np.arange(len(block_sets)), counts)
+    status = np.zeros(len(block_sets), dtype=np.uint8)
+
+    status[counts == 0] = INVALID
+    out_of_range = (blocks < 0) | (blocks >= block_map.total_blocks)
+    status[owners[out_of_range]] = INVALID
+
+    # Bitmap test for every block at once
+    bits = np.frombuffer(block_map.bits, dtype=np.uint8)
+    in_range = np.flatnonzero(~out_of_range)
+    checked = blocks[in_range]
+    allocated = (bits[checked >> 3] >> (checked & 7).astype(np.uint8)) & 1
+    in_use = owners[in_range[allocated.astype(bool)]]
+    status[in_use[status[in_use] == OK]] = IN_USE
+
+    # Repeated blocks: within one set, or shared between sets
+    order = np.lexsort((owners, blocks))
+    sorted_blocks, sorted_owners = blocks[order], owners[order]
+    repeated = sorted_blocks[1:] == sorted_blocks[:-1]
+    if repeated.any():
+        same_set = repeated & (sorted_owners[1:] == sorted_owners[:-1])
+        self_overlap = sorted_owners[1:][same_set]
+        status[self_overlap[status[self_overlap] == OK]] = OVERLAP
+
+        shared = np.zeros(len(sorted_blocks), dtype=bool)
+        shared[1:] |= repeated
+        shared[:-1] |= repeated
+        shared &= status[sorted_owners] == OK
+        if shared.any():
+            # Only the shared blocks of each contested set matter
+            contested = {}
+            for owner, block in zip(sorted_owners[shared].tolist(), sorted_blocks[shared].tolist()):
+                contested.setdefault(owner, []).append(block)
+            taken = set()
+            for owner in sorted(contested):
+                if taken.isdisjoint(contested[owner]):
+                    taken.update(contested[owner])
+                else:
+                    status[owner] = OVERLAP
+
+    def commit():
+        # Coalesce the accepted blocks into runs of consecutive blocks
+        chosen = np.sort(blocks[status[owners] == OK])
+        breaks = np.flatnonzero(np.diff(chosen) != 1) + 1
+        run_starts = chosen[np.concatenate(([0], breaks))] if len(chosen) else chosen
+        run_lengths = np.diff(np.concatenate(([0], breaks, [len(chosen)]))) if len(chosen) else chosen
+        block_map.allocate_runs(zip(run_starts.tolist(), run_lengths.tolist()))
+
+    return _finish(status, atomic, commit)
+
+def _allocate_block_sets_python(block_map, block_sets, atomic):
+    status = [OK] * len(block_sets)
+    taken = set()
+    for i, blocks in enumerate(block_sets):
+        if not blocks or any(not 0 <= block < block_map.total_blocks for block in blocks):
+            status[i] = INVALID
+        elif any(block_map.is_allocated(block) for block in blocks):
+            status[i] = IN_USE
+        elif len(set(blocks)) != len(blocks) or not taken.isdisjoint(blocks):
+            status[i] = OVERLAP
+        else:
+            taken.update(blocks)
+
+    def commit():
+        accepted = chain.from_iterable(blocks for blocks, code in zip(block_sets, status) if code == OK)
+        block_map.allocate_runs((start, length) for start, length in block_runs(accepted))
+
+    return _finish(status, atomic, commit)
+
+if __name__ == "__main__":
+    total_blocks = 10_000_000
+    rng = random.Random(1)
+    extents = [(rng.randrange(total_blocks - 64), rng.randint(1, 64)) for _ in range(50_000)]
+    block_sets = [rng.sample(range(total_blocks), 8) for _ in range(50_000)]
+
+    for label, batch, allocate, one_by_one in (
+            ("Extents", extents, allocate_extents, _allocate_extents_python),
+            ("Block sets", block_sets, allocate_block_sets, _allocate_block_sets_python)):
+        for mode, function in (("batch", allocate), ("loop", one_by_one)):
+            if mode == "batch" and np is None:
+                continue
+            block_map = BlockMap(total_blocks)
+            began = time.perf_counter()
+            status = function(block_map, batch, False)
+            elapsed = time.perf_counter() - began
+            print(f"{label} ({mode}): {len(batch)} requests in {elapsed:.3f}s -> {summarize(status)}")
@@ -0,0 +1,547 @@
+"""
+Bitmap disk block map with a free-extent index
+
+Block state lives in a bytearray bitmap (bit i of byte i // 8, LSB first,
+1 = allocated), so a disk of 10^8 blocks takes 12.5 MB. Free space is also
+kept as a set of maximal free extents (start, length) in two indexes:
+
+* a treap keyed by start, where each node also stores the longest extent in
+  its subtree. This gives first-fit and next-fit (the leftmost extent with
+  at least k blocks at or after a position) and containment lookups in
+  O(log E) expected time, where E is the number of free extents.
+* a sorted index of (length, start) pairs for best-fit and worst-fit, held
+  as a list of bounded sorted chunks so that an update moves at most one
+  chunk's worth of entries, searched with bisect.
+
+Allocating or freeing a range updates the bitmap in bulk (whole bytes are
+assigned with one slice) and touches at most three extents. Large batches of
+runs (allocate_runs) split the extent list in one pass and rebuild the
+index in linear time instead.
+"""
+
+import random
+import re
+from bisect import bisect_left, insort
+
+STRATEGIES = ('first', 'best', 'worst', 'next')
+
+# Runs of whole free bytes, whole allocated bytes, or a single mixed byte
+_BYTE_RUNS = re.compile(rb'\x00+|\xff+|.', re.DOTALL)
+
+# Free bit ranges [lo, hi) of every byte value
+_FREE_BITS = []
+for _value in range(256):
+    _ranges = []
+    for _bit in range(8):
+        if not _value >> _bit & 1:
+            if _ranges and _ranges[-1][1] == _bit:
+                _ranges[-1][1] = _bit + 1
+            else:
+                _ranges.append([_bit, _bit + 1])
+    _FREE_BITS.append(tuple(map(tuple, _ranges)))
+
+_priorities = random.Random(0x5EED)
+
+CHUNK_SIZE = 512
+
+class _SortedPairs:
+    """Sorted multiset of (length, start) pairs stored as sorted chunks"""
+
+    def __init__(self, pairs=()):
+        pairs = sorted(pairs)
+        self._chunks = [pairs[i:i + CHUNK_SIZE] for i in range(0, len(pairs), CHUNK_SIZE)]
+        self._maxes = [chunk[-1] for chunk in self._chunks]
+
+    def __len__(self):
+        return sum(map(len, self._chunks))
+
+    def add(self, pair):
+        if not self._chunks:
+            self._chunks.append([pair])
+            self._maxes.append(pair)
+            return
+        i = bisect_left(self._maxes, pair)
+        if i == len(self._chunks):
+            i -= 1
+        chunk = self._chunks[i]
+        insort(chunk, pair)
+        self._maxes[i] = chunk[-1]
+        if len(chunk) > 2 * CHUNK_SIZE:
+            self._chunks[i + 1:i + 1] = [chunk[CHUNK_SIZE:]]
+            del chunk[CHUNK_SIZE:]
+            self._maxes[i:i + 1] = [chunk[-1], self._chunks[i + 1][-1]]
+
+    def remove(self, pair):
+        i = bisect_left(self._maxes, pair)
+        chunk = self._chunks[i]
+        del chunk[bisect_left(chunk, pair)]
+        if chunk:
+            self._maxes[i] = chunk[-1]
+        else:
+            del self._chunks[i]
+            del self._maxes[i]
+
+    def ceiling(self, pair):
+        """Smallest stored pair >= pair, or None"""
+        i = bisect_left(self._maxes, pair)
+        if i == len(self._chunks):
+            return None
+        chunk = self._chunks[i]
+        return chunk[bisect_left(chunk, pair)]
+
+    def last(self):
+        return self._maxes[-1] if self._maxes else None
+
+class _Extent:
+    """Treap node for one free extent"""
+    __slots__ = ('start', 'length', 'max_length', 'priority', 'left', 'right')
+
+    def __init__(self, start, length):
+        self.start = start
+        self.length = length
+        self.max_length = length
+        self.priority = _priorities.random()
+        self.left = None
+        self.right = None
+
+def _update(node):
+    longest = node.length
+    if node.left is not None and node.left.max_length > longest:
+        longest = node.left.max_length
+    if node.right is not None and node.right.max_length > longest:
+        longest = node.right.max_length
+    node.max_length = longest
+
+def _split(node, key):
+    """Split into (extents starting before key, extents starting at or after key)"""
+    if node is None:
+        return None, None
+    if node.start < key:
+        node.right, right = _split(node.right, key)
+        _update(node)
+        return node, right
+    left, node.left = _split(node.left, key)
+    _update(node)
+    return left, node
+
+def _merge(left, right):
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _update(left)
+        return left
+    right.left = _merge(left, right.left)
+    _update(right)
+    return right
+
+def _leftmost_fit(node, length, lowest_start):
+    """Leftmost extent with start >= lowest_start and at least length blocks"""
+    while node is not None and node.max_length >= length:
+        if node.start < lowest_start:
+            node = node.right
+            continue
+        found = _leftmost_fit(node.left, length, lowest_start)
+        if found is not None:
+            return found
+        if node.length >= length:
+            return node
+        node = node.right
+    return None
+
+def _build(extents):
+    """Treap over extents sorted by start, built in O(n) by keeping the
+    right spine on a stack"""
+    spine = []
+    for start, length in extents:
+        node = _Extent(start, length)
+        last = None
+        while spine and spine[-1].priority < node.priority:
+            last = spine.pop()
+            _update(last)
+        node.left = last
+        if spine:
+            spine[-1].right = node
+        spine.append(node)
+    for node in reversed(spine):
+        _update(node)
+    return spine[0] if spine else None
+
+def _iter_extents(node):
+    stack = []
+    while stack or node is not None:
+        while node is not None:
+            stack.append(node)
+            node = node.left
+        node = stack.pop()
+        yield node.start, node.length
+        node = node.right
+
+class BlockMap:
+    """Bitmap of disk blocks with an index of free extents.
+
+    ``bitmap`` may be an existing buffer (a bytearray or an mmap) of at
+    least ``(total_blocks + 7) // 8`` bytes. Its contents are kept and the
+    extent index is rebuilt from it; otherwise every block starts free. Over
+    a read-only buffer the map can be queried, but allocating or freeing
+    raises ValueError before anything changes.
+    """
+
+    def __init__(self, total_blocks, bitmap=None):
+        if total_blocks < 0:
+            raise ValueError("total_blocks must be non-negative")
+        nbytes = (total_blocks + 7) // 8
+        if bitmap is None:
+            bitmap = bytearray(nbytes)
+        elif len(bitmap) < nbytes:
+            raise ValueError(f"bitmap holds {len(bitmap) * 8} blocks, need {total_blocks}")
+        self.total_blocks = total_blocks
+        self.bits = bitmap
+        with memoryview(bitmap) as view:
+            self.readonly = view.readonly
+        self.next_fit_cursor = 0
+        # Padding bits past the last block are kept allocated
+        padding = 0xFF & ~((1 << (total_blocks & 7)) - 1) if total_blocks & 7 else 0
+        if padding and not self.readonly and self.bits[nbytes - 1] & padding != padding:
+            self.bits[nbytes - 1] |= padding
+        self._rebuild_index()
+
+    def _check_writable(self):
+        if self.readonly:
+            raise ValueError("block map is read-only")
+
+    def _rebuild_index(self):
+        extents = []
+        run_start = None
+        block = 0
+        for match in _BYTE_RUNS.finditer(self.bits, 0, (self.total_blocks + 7) // 8):
+            run = match.group()
+            first = run[0]
+            if first == 0:
+                if run_start is None:
+                    run_start = block
+                block += 8 * len(run)
+                continue
+            if first == 0xFF:
+                if run_start is not None:
+                    extents.append((run_start, block - run_start))
+                    run_start = None
+                block += 8 * len(run)
+                continue
+            for lo, hi in _FREE_BITS[first]:
+                if lo:
+                    if run_start is not None:
+                        extents.append((run_start, block - run_start))
+                    run_start = block + lo
+                elif run_start is None:
+                    run_start = block
+                if hi < 8:
+                    extents.append((run_start, block + hi - run_start))
+                    run_start = None
+            block += 8
+        if run_start is not None:
+            extents.append((run_start, min(block, self.total_blocks) - run_start))
+        extents = [extent for extent in extents if extent[1] > 0]
+        self._root = _build(extents)
+        self.free_blocks = sum(length for _, length in extents)
+        self._by_length = _SortedPairs((length, start) for start, length in extents)
+
+    # Extent index maintenance
+
+    def _floor_path(self, block):
+        """Root-to-node path ending at the free extent with the greatest
+        start <= block; the path is empty if there is none"""
+        path = []
+        floor_depth = 0
+        node = self._root
+        while node is not None:
+            path.append(node)
+            if node.start <= block:
+                floor_depth = len(path)
+                node = node.right
+            else:
+                node = node.left
+        del path[floor_depth:]
+        return path
+
+    def _insert_extent(self, start, length):
+        extent = _Extent(start, length)
+        parent, node = None, self._root
+        while node is not None and node.priority > extent.priority:
+            if length > node.max_length:
+                node.max_length = length
+            parent = node
+            node = node.left if start < node.start else node.right
+        extent.left, extent.right = _split(node, start)
+        _update(extent)
+        if parent is None:
+            self._root = extent
+        elif start < parent.start:
+            parent.left = extent
+        else:
+            parent.right = extent
+        self._by_length.add((length, start))
+
+    def _remove_extent(self, path):
+        """Remove the extent at the end of a root-to-node path"""
+        node = path.pop()
+        replacement = _merge(node.left, node.right)
+        if not path:
+            self._root = replacement
+        elif path[-1].left is node:
+            path[-1].left = replacement
+        else:
+            path[-1].right = replacement
+        for ancestor in reversed(path):
+            _update(ancestor)
+        self._by_length.remove((node.length, node.start))
+
+    def _resize_extent(self, path, start, length):
+        """Move or resize the extent at the end of a path in place; the new
+        range must not cross any other extent, so treap order is kept"""
+        node = path[-1]
+        self._by_length.remove((node.length, node.start))
+        self._by_length.add((length, start))
+        node.start, node.length = start, length
+        for ancestor in reversed(path):
+            _update(ancestor)
+
+    def _extent_at_or_before(self, block):
+        """The free extent with the greatest start <= block, or None"""
+        node = self._root
+        best = None
+        while node is not None:
+            if node.start <= block:
+                best = node
+                node = node.right
+            else:
+                node = node.left
+        return best
+
+    def _extent_after(self, block):
+        """The free extent with the smallest start > block, or None"""
+        node = self._root
+        best = None
+        while node is not None:
+            if node.start > block:
+                best = node
+                node = node.left
+            else:
+                node = node.right
+        return best
+
+    def free_extent_containing(self, block):
+        """(start, length) of the free extent containing block, or None"""
+        node = self._extent_at_or_before(block)
+        if node is not None and block < node.start + node.length:
+            return node.start, node.length
+        return None
+
+    def free_extents(self):
+        """Yield (start, length) of every free extent in block order"""
+        return _iter_extents(self._root)
+
+    def largest_free_extent(self):
+        largest = self._by_length.last()
+        return largest[0] if largest else 0
+
+    # Bitmap access
+
+    def _set_range(self, start, stop, allocated):
+        """Set or clear bits [start, stop) with whole-byte slice assignment"""
+        bits = self.bits
+        first_byte, last_byte = (start + 7) >> 3, stop >> 3
+        if first_byte > last_byte:
+            # Range lies inside a single byte
+            mask = ((1 << (stop - start)) - 1) << (start & 7)
+            if allocated:
+                bits[start >> 3] |= mask
+            else:
+                bits[start >> 3] &= ~mask & 0xFF
+            return
+        if start & 7:
+            mask = 0xFF & ~((1 << (start & 7)) - 1)
+            if allocated:
+                bits[start >> 3] |= mask
+            else:
+                bits[start >> 3] &= ~mask & 0xFF
+        if last_byte > first_byte:
+            bits[first_byte:last_byte] = (b'\xff' if allocated else b'\x00') * (last_byte - first_byte)
+        if stop & 7:
+            mask = (1 << (stop & 7)) - 1
+            if allocated:
+                bits[last_byte] |= mask
+            else:
+                bits[last_byte] &= ~mask & 0xFF
+
+    def is_allocated(self, block):
+        return bool(self.bits[block >> 3] >> (block & 7) & 1)
+
+    def __getitem__(self, block):
+        if not 0 <= block < self.total_blocks:
+            raise IndexError(f"block {block} out of range")
+        return self.bits[block >> 3] >> (block & 7) & 1
+
+    def __len__(self):
+        return self.total_blocks
+
+    @property
+    def allocated_blocks(self):
+        return self.total_blocks - self.free_blocks
+
+    def first_allocated(self, start, stop):
+        """First allocated block in [start, stop), or -1 if all are free"""
+        stop = min(stop, self.total_blocks)
+        if start >= stop:
+            return -1
+        extent = self.free_extent_containing(start)
+        if extent is None:
+            return start
+        end = extent[0] + extent[1]
+        return end if end < stop else -1
+
+    # Allocation
+
+    def find(self, length, strategy='first'):
+        """Start of a free run of ``length`` blocks chosen by ``strategy``, or None"""
+        if length <= 0:
+            raise ValueError("length must be positive")
+        if strategy == 'first':
+            node = _leftmost_fit(self._root, length, 0)
+            return None if node is None else node.start
+        if strategy == 'best':
+            pair = self._by_length.ceiling((length, -1))
+            return None if pair is None else pair[1]
+        if strategy == 'worst':
+            largest = self._by_length.last()
+            if largest is None or largest[0] < length:
+                return None
+            # Lowest start among the largest extents
+            return self._by_length.ceiling((largest[0], -1))[1]
+        if strategy == 'next':
+            cursor = self.next_fit_cursor if self.next_fit_cursor < self.total_blocks else 0
+            extent = self.free_extent_containing(cursor)
+            if extent is not None and extent[0] + extent[1] - cursor >= length:
+                return cursor
+            node = _leftmost_fit(self._root, length, cursor + 1)
+            if node is None:
+                # Wrap around to the start of the disk
+                node = _leftmost_fit(self._root, length, 0)
+            return None if node is None else node.start
+        raise ValueError(f"Unknown strategy '{strategy}', expected one of {', '.join(STRATEGIES)}")
+
+    def allocate(self, length, strategy='first'):
+        """Allocate ``length`` contiguous blocks; return the start or None"""
+        start = self.find(length, strategy)
+        if start is not None:
+            self.allocate_at(start, length)
+        return start
+
+    def allocate_at(self, start, length):
+        """Allocate blocks [start, start + length); return False if any is
+        out of range or already allocated"""
+        self._check_writable()
+        if length <= 0 or start < 0 or start + length > self.total_blocks:
+            return False
+        path = self._floor_path(start)
+        if not path:
+            return False
+        ext_start, ext_length = path[-1].start, path[-1].length
+        ext_end, end = ext_start + ext_length, start + length
+        if end > ext_end:
+            return False
+        if start > ext_start:
+            # Keep the head in place and add the tail (if any) as a new extent
+            self._resize_extent(path, ext_start, start - ext_start)
+            if end < ext_end:
+                self._insert_extent(end, ext_end - end)
+        elif end < ext_end:
+            self._resize_extent(path, end, ext_end - end)
+        else:
+            self._remove_extent(path)
+        self._set_range(start, end, True)
+        self.free_blocks -= length
+        self.next_fit_cursor = end
+        return True
+
+    def allocate_runs(self, runs):
+        """Allocate many (start, length) runs at once. The runs must be
+        sorted by start, disjoint and free; otherwise ValueError is raised
+        and nothing is allocated. When there are many runs compared to free
+        extents, the extents are split in one merge pass and the index is
+        rebuilt instead of being updated run by run."""
+        self._check_writable()
+        runs = list(runs)
+        if len(runs) * 4 < len(self._by_length):
+            for done, (start, length) in enumerate(runs):
+                if not self.allocate_at(start, length):
+                    for undo_start, undo_length in runs[:done]:
+                        self.free(undo_start, undo_length)
+                    raise ValueError(f"range {start}+{length} is not free")
+            return
+
+        extents = []
+        free = self.free_extents()
+        extent = next(free, None)
+        allocated = 0
+        for start, length in runs:
+            end = start + length
+            while extent is not None and extent[0] + extent[1] <= start:
+                extents.append(extent)
+                extent = next(free, None)
+            if length <= 0 or extent is None or start < extent[0] or end > extent[0] + extent[1]:
+                raise ValueError(f"range {start}+{length} is not free")
+            if start > extent[0]:
+                extents.append((extent[0], start - extent[0]))
+            extent_end = extent[0] + extent[1]
+            extent = (end, extent_end - end) if end < extent_end else next(free, None)
+            allocated += length
+        if extent is not None:
+            extents.append(extent)
+            extents.extend(free)
+
+        for start, length in runs:
+            self._set_range(start, start + length, True)
+        self._root = _build(extents)
+        self._by_length = _SortedPairs((length, start) for start, length in extents)
+        self.free_blocks -= allocated
+        if runs:
+            self.next_fit_cursor = runs[-1][0] + runs[-1][1]
+
+    def free(self, start, length):
+        """Free blocks [start, start + length), merging with neighbouring
+        free extents. Every block in the range must be allocated."""
+        self._check_writable()
+        if length <= 0 or start < 0 or start + length > self.total_blocks:
+            raise ValueError(f"range {start}+{length} is outside the disk")
+        end = start + length
+        path = self._floor_path(end - 1)
+        before = path[-1] if path else None
+        if before is not None and before.start + before.length > start:
+            raise ValueError(f"range {start}+{length} overlaps free blocks")
+        after = self._extent_after(start)
+        if after is not None and after.start != end:
+            after = None
+        if before is not None and before.start + before.length == start:
+            if after is not None:
+                end += after.length
+                self._remove_extent(self._floor_path(after.start))
+                path = self._floor_path(before.start)
+            self._resize_extent(path, before.start, end - before.start)
+        elif after is not None:
+            self._resize_extent(self._floor_path(after.start), start, end + after.length - start)
+        else:
+            self._insert_extent(start, length)
+        self._set_range(start, start + length, False)
+        self.free_blocks += length
+
+    def mark(self, start, length, allocated=True):
+        """Set a range to allocated or free regardless of its current state
+        and rebuild the extent index (for bulk loading)"""
+        self._check_writable()
+        if length <= 0 or start < 0 or start + length > self.total_blocks:
+            raise ValueError(f"range {start}+{length} is outside the disk")
+        self._set_range(start, start + length, allocated)
+        self._rebuild_index()
@@ -0,0 +1,147 @@
+"""
+Run-length and density reports for large block maps
+
+Printing one line per block is fine for a 50-block exercise, but on a disk
+with millions of blocks the report itself becomes the bottleneck. The
+functions here walk a BlockMap's free-extent index instead of its blocks:
+
+* iter_runs() yields maximal runs of blocks with the same state and owner
+  in O(E + F), where E is the number of free extents and F the number of
+  owner intervals.
+* render_runs() streams one line per run ("Blocks 0-40959: Allocated to
+  F3") to any file object, with buffered writes.
+* density_map() draws one character per N blocks, shaded by how much of
+  that span is allocated, so a whole disk fits on a screen at any zoom.
+"""
+
+import sys
+
+SHADES = " ░▒▓█"  # free, partly allocated (light to dark), fully allocated
+
+# Disks up to this size still get the classic one-line-per-block table
+DETAIL_LIMIT = 1000
+
+def iter_runs(block_map, owners=()):
+    """Yield (start, end, label) for every maximal run of blocks, with end
+    exclusive. ``owners`` is an iterable of (start, length, label) ranges of
+    allocated blocks; label is None for free runs and "" for allocated
+    blocks that no owner range covers."""
+    owners = sorted(owners)
+    next_owner = 0
+    pending = None  # run held back so that equal neighbours merge
+
+    def allocated_runs(start, end):
+        # Split [start, end) by the owner ranges that overlap it
+        nonlocal next_owner
+        position = start
+        while next_owner < len(owners) and position < end:
+            owner_start, owner_length, label = owners[next_owner]
+            owner_end = owner_start + owner_length
+            if owner_end <= position:
+                next_owner += 1
+                continue
+            if owner_start >= end:
+                break
+            if owner_start > position:
+                yield position, owner_start, ""
+                position = owner_start
+            stop = min(owner_end, end)
+            yield position, stop, label
+            position = stop
+            if owner_end <= end:
+                next_owner += 1
+        if position < end:
+            yield position, end, ""
+
+    def runs():
+        position = 0
+        for free_start, free_length in block_map.free_extents():
+            if free_start > position:
+                yield from allocated_runs(position, free_start)
+            yield free_start, free_start + free_length, None
+            position = free_start + free_length
+        if position < block_map.total_blocks:
+            yield from allocated_runs(position, block_map.total_blocks)
+
+    for run in runs():
+        if pending is not None and pending[1] == run[0] and pending[2] == run[2]:
+            pending = (pending[0], run[1], run[2])
+            continue
+        if pending is not None:
+            yield pending
+        pending = run
+    if pending is not None:
+        yield pending
+
+def describe(label):
+    if label is None:
+        return "Free"
+    return f"Allocated to {label}" if label else "Allocated"
+
+def render_runs(block_map, owners=(), out=None, batch=4096):
+    """Write "Blocks <start>-<end>: <state>" for every run in linear time"""
+    out = sys.stdout if out is None else out
+    parts = []
+    for start, end, label in iter_runs(block_map, owners):
+        parts.append(f"Blocks {start}-{end - 1}: {describe(label)}\n")
+        if len(parts) >= batch:
+            out.write("".join(parts))
+            parts.clear()
+    out.write("".join(parts))
+
+def auto_scale(total_blocks, width=64, rows=16):
+    """Smallest blocks-per-character that fits the disk in ``rows`` rows"""
+    return max(1, -(-total_blocks // (width * rows)))
+
+def print_large_disk_report(block_map, owners=(), out=None):
+    """Run-length table plus a density map scaled to fit the screen"""
+    out = sys.stdout if out is None else out
+    out.write("\nBlock Runs:\n")
+    render_runs(block_map, owners, out)
+    scale = auto_scale(block_map.total_blocks)
+    out.write(f"\nDensity Map ({scale} blocks per character; █ = allocated, ▓▒░ = partly allocated, blank = free):\n")
+    density_map(block_map, scale, out=out)
+
+def density_map(block_map, blocks_per_char, width=64, out=None):
+    """Draw the disk with one character per ``blocks_per_char`` blocks and
+    ``width`` characters per row. Each character is shaded by the share of
+    its blocks that are allocated, so memory use is one row at a time."""
+    if blocks_per_char <= 0:
+        raise ValueError("blocks_per_char must be positive")
+    out = sys.stdout if out is None else out
+    total = block_map.total_blocks
+    cells = (total + blocks_per_char - 1) // blocks_per_char
+    row_blocks = blocks_per_char * width
+    extents = block_map.free_extents()
+    extent = next(extents, None)
+    digits = len(str(total))
+
+    for row_start in range(0, cells, width):
+        # Count free blocks per cell of this row by walking the extents
+        free = [0] * min(width, cells - row_start)
+        first_block = row_start * blocks_per_char
+        last_block = min(first_block + row_blocks, total)
+        while extent is not None and extent[0] < last_block:
+            start = max(extent[0], first_block)
+            end = min(extent[0] + extent[1], last_block)
+            while start < end:
+                cell = (start - first_block) // blocks_per_char
+                cell_end = min(first_block + (cell + 1) * blocks_per_char, end)
+                free[cell] += cell_end - start
+                start = cell_end
+            if extent[0] + extent[1] > last_block:
+                break  # extent continues on the next row
+            extent = next(extents, None)
+
+        row = []
+        for cell, free_blocks in enumerate(free):
+            cell_start = first_block + cell * blocks_per_char
+            size = min(blocks_per_char, total - cell_start)
+            used = (size - free_blocks) / size
+            if used >= 1:
+                row.append(SHADES[-1])
+            elif used == 0:
+                row.append(SHADES[0])
+            else:
+                row.append(SHADES[1 + min(int(used * 3), 2)])
+        out.write(f"Blocks {first_block:>{digits}}-{last_block - 1:<{digits}} |{''.join(row)}|\n")
@@ -0,0 +1,329 @@
+"""
+Compaction (defragmentation) for contiguous file allocation
+
+When free space is split into holes, a file can be rejected even though
+enough blocks are free in total. Compaction moves files so that all free
+space becomes one run. Sliding everything towards block 0 always works but
+often moves far more data than needed, so plan_compaction() also tries to
+leave the free run in the middle of the disk:
+
+* Window plans: pick a span of exactly F blocks (F = free blocks), starting
+  and ending on file/hole boundaries, to become the free run. Files inside
+  it are moved into the holes outside it, largest first into the best
+  fitting hole. The cost is the number of allocated blocks in the window;
+  candidates are tried cheapest first until one packs exactly.
+* Slide plan: slide the files between the first and the last hole towards
+  block 0 in order, leaving files already packed against either end of the
+  disk alone. This always works and is used when no window plan is cheaper.
+
+Blocks that the file table does not own (for example indexed files sharing
+the same disk image) are passed as pinned ranges: windows never cover them
+and slid files skip over them, so the free run is then the longest one the
+slide leaves rather than always all free space. pinned_extents() finds them
+from a BlockMap.
+
+Compactor applies a plan to a BlockMap in place, either all at once or a
+bounded number of moves per call (incremental compaction), and keeps
+count of blocks moved and a simulated I/O cost.
+"""
+
+import random
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from typing import List
+
+from block_map import BlockMap
+
+_PINNED = object()  # segment label of a pinned range in plan_compaction()
+
+@dataclass
+class Move:
+    name: str
+    source: int
+    target: int
+    length: int
+
+@dataclass
+class CompactionPlan:
+    moves: List[Move] = field(default_factory=list)
+    free_start: int = 0
+    free_length: int = 0
+
+    @property
+    def blocks_moved(self):
+        return sum(move.length for move in self.moves)
+
+def _slide_plan(total_blocks, ordered):
+    """Slide the files between the first and the last hole down towards
+    block 0 in order; files already packed against either end stay put"""
+    position = 0
+    first = 0
+    while first < len(ordered) and ordered[first][0] == position:
+        position += ordered[first][1]
+        first += 1
+    end = total_blocks
+    last = len(ordered)
+    while last > first and ordered[last - 1][0] + ordered[last - 1][1] == end:
+        end = ordered[last - 1][0]
+        last -= 1
+
+    moves = []
+    for start, length, name in ordered[first:last]:
+        moves.append(Move(name, start, position, length))
+        position += length
+    return CompactionPlan(moves, position, end - position)
+
+def _slide_around_pinned(total_blocks, ordered, pinned):
+    """Slide files down in order like _slide_plan, jumping over pinned
+    ranges a file would overlap. The free run is the longest gap left."""
+    moves = []
+    occupied = list(pinned)
+    position = 0
+    p = 0
+    for start, length, name in ordered:
+        while True:
+            while p < len(pinned) and pinned[p][0] + pinned[p][1] <= position:
+                p += 1
+            if p < len(pinned) and pinned[p][0] < position + length:
+                position = pinned[p][0] + pinned[p][1]
+                continue
+            break
+        if position != start:
+            moves.append(Move(name, start, position, length))
+        occupied.append((position, length))
+        position += length
+
+    free_start = free_length = 0
+    position = 0
+    for start, length in sorted(occupied) + [(total_blocks, 0)]:
+        if start - position > free_length:
+            free_start, free_length = position, start - position
+        position = max(position, start + length)
+    return CompactionPlan(moves, free_start, free_length)
+
+def _pack_into_holes(files, holes):
+    """Place (start, length, name) files into (start, length) holes, largest
+    file first into the smallest hole that fits; None if one does not fit"""
+    by_length = sorted((length, start) for start, length in holes)
+    moves = []
+    for start, length, name in sorted(files, key=lambda f: -f[1]):
+        i = bisect_left(by_length, (length, -1))
+        if i == len(by_length):
+            return None
+        hole_length, hole_start = by_length.pop(i)
+        moves.append(Move(name, start, hole_start, length))
+        if hole_length > length:
+            insort(by_length, (hole_length - length, hole_start + length))
+    return moves
+
+def pinned_extents(block_map, files):
+    """(start, length) runs of allocated blocks in ``block_map`` that no
+    file in ``files`` (name -> (start, length)) owns"""
+    owned = sorted(files.values())
+    pinned = []
+    k = 0
+    position = 0
+    free_runs = list(block_map.free_extents()) + [(block_map.total_blocks, 0)]
+    for free_start, free_length in free_runs:
+        # [position, free_start) is allocated: keep what the files do not cover
+        while position < free_start:
+            while k < len(owned) and owned[k][0] + owned[k][1] <= position:
+                k += 1
+            if k < len(owned) and owned[k][0] <= position:
+                position = owned[k][0] + owned[k][1]
+                continue
+            stop = min(owned[k][0], free_start) if k < len(owned) else free_start
+            pinned.append((position, stop - position))
+            position = stop
+        position = free_start + free_length
+    return pinned
+
+def plan_compaction(total_blocks, files, pinned=()):
+    """Plan moves that leave a single free run, moving as few blocks as
+    this heuristic can find. ``files`` maps name -> (start, length);
+    ``pinned`` lists (start, length) ranges of allocated blocks that must
+    not move."""
+    ordered = sorted((start, length, name) for name, (start, length) in files.items())
+    pinned = sorted(pinned)
+    if pinned:
+        slide = _slide_around_pinned(total_blocks, ordered, pinned)
+    else:
+        slide = _slide_plan(total_blocks, ordered)
+    free_total = total_blocks - sum(length for _, length, _ in ordered) - sum(length for _, length in pinned)
+    if not slide.moves:
+        return slide
+
+    # Disk as alternating segments: (start, length, name, None for a hole
+    # or _PINNED for a pinned range)
+    segments = []
+    position = 0
+    for start, length, name in sorted(ordered + [(start, length, _PINNED) for start, length in pinned],
+                                      key=lambda segment: segment[0]):
+        if start > position:
+            segments.append((position, start - position, None))
+        segments.append((start, length, name))
+        position = start + length
+    if position < total_blocks:
+        segments.append((position, total_blocks - position, None))
+
+    # Every window of exactly free_total blocks on segment boundaries,
+    # without pinned ranges in it
+    candidates = []
+    j = 0
+    covered = allocated = pinned_inside = 0
+    for i, (start, _, _) in enumerate(segments):
+        while j < len(segments) and covered < free_total:
+            covered += segments[j][1]
+            if segments[j][2] is _PINNED:
+                pinned_inside += 1
+            elif segments[j][2] is not None:
+                allocated += segments[j][1]
+            j += 1
+        if covered == free_total and not pinned_inside and allocated < slide.blocks_moved:
+            candidates.append((allocated, i, j))
+        covered -= segments[i][1]
+        if segments[i][2] is _PINNED:
+            pinned_inside -= 1
+        elif segments[i][2] is not None:
+            allocated -= segments[i][1]
+
+    for allocated, i, j in sorted(candidates):
+        inside = [segment for segment in segments[i:j] if segment[2] is not None]
+        holes = [(start, length) for start, length, name in segments[:i] + segments[j:] if name is None]
+        moves = _pack_into_holes(inside, holes)
+        if moves is not None:
+            return CompactionPlan(moves, segments[i][0], free_total)
+    return slide
+
+class Compactor:
+    """Applies a compaction plan to a BlockMap and a name -> (start, length)
+    file table, a bounded number of moves at a time.
+
+    Moving a block costs ``read_cost + write_cost``, and each move also costs
+    ``seek_cost`` (simulated units). If the disk changes between steps so
+    that the next move is no longer valid, the rest of the plan is redone.
+    ``pinned`` ranges (allocated blocks the table does not own) never move.
+    """
+
+    def __init__(self, block_map, files, read_cost=1, write_cost=1, seek_cost=5, pinned=()):
+        self.block_map = block_map
+        self.files = files
+        self.pinned = list(pinned)
+        self.read_cost = read_cost
+        self.write_cost = write_cost
+        self.seek_cost = seek_cost
+        self.blocks_moved = 0
+        self.moves_done = 0
+        self.io_cost = 0
+        self.replan()
+
+    def replan(self):
+        self.plan = plan_compaction(self.block_map.total_blocks, self.files, self.pinned)
+        self._next = 0
+
+    @property
+    def done(self):
+        return self._next >= len(self.plan.moves)
+
+    def _apply(self, move):
+        if self.files.get(move.name) != (move.source, move.length):
+            return False
+        block_map = self.block_map
+        block_map.free(move.source, move.length)
+        if not block_map.allocate_at(move.target, move.length):
+            block_map.allocate_at(move.source, move.length)
+            return False
+        self.files[move.name] = (move.target, move.length)
+        self.blocks_moved += move.length
+        self.moves_done += 1
+        self.io_cost += move.length * (self.read_cost + self.write_cost) + self.seek_cost
+        return True
+
+    def step(self, max_moves=None):
+        """Apply up to ``max_moves`` moves (all remaining if None) and
+        return the moves applied"""
+        applied = []
+        replanned = False
+        while not self.done and (max_moves is None or len(applied) < max_moves):
+            move = self.plan.moves[self._next]
+            if not self._apply(move):
+                if replanned:
+                    break
+                self.replan()
+                replanned = True
+                continue
+            self._next += 1
+            applied.append(move)
+        return applied
+
+    def run(self):
+        return self.step()
+
+def generate_workload(total_blocks, count, max_length=None, free_ratio=0.4, seed=None):
+    """Random ('alloc', name, length) and ('free', name) requests"""
+    rng = random.Random(seed)
+    max_length = max_length or max(1, total_blocks // 50)
+    live = []
+    requests = []
+    for i in range(count):
+        if live and rng.random() < free_ratio:
+            requests.append(('free', live.pop(rng.randrange(len(live)))))
+        else:
+            name = f"F{i}"
+            requests.append(('alloc', name, rng.randint(1, max_length)))
+            live.append(name)
+    return requests
+
+def compaction_tradeoff(total_blocks, requests, budgets=(0, 1, 4, 16, None), strategy='first'):
+    """Replay a workload once per budget. When an allocation fails for lack
+    of a contiguous run, up to ``budget`` compaction moves are made (all of
+    them if None, none if 0) before one retry. Returns a row per budget with
+    the failure rate, how many failures had enough free blocks in total, and
+    the compaction I/O it cost."""
+    rows = []
+    for budget in budgets:
+        block_map = BlockMap(total_blocks)
+        files = {}
+        failures = fragmented = allocations = blocks_moved = io_cost = 0
+        for request in requests:
+            if request[0] == 'free':
+                if request[1] in files:
+                    block_map.free(*files.pop(request[1]))
+                continue
+            _, name, length = request
+            allocations += 1
+            start = block_map.allocate(length, strategy)
+            if start is None and budget != 0 and block_map.free_blocks >= length:
+                compactor = Compactor(block_map, files)
+                compactor.step(budget)
+                blocks_moved += compactor.blocks_moved
+                io_cost += compactor.io_cost
+                start = block_map.allocate(length, strategy)
+            if start is None:
+                failures += 1
+                if block_map.free_blocks >= length:
+                    fragmented += 1  # enough space, but not in one run
+            else:
+                files[name] = (start, length)
+        rows.append({
+            'budget': 'full' if budget is None else budget,
+            'allocations': allocations,
+            'failures': failures,
+            'failure_rate': failures / allocations if allocations else 0.0,
+            'fragmentation_failures': fragmented,
+            'blocks_moved': blocks_moved,
+            'io_cost': io_cost,
+        })
+    return rows
+
+def print_tradeoff(rows):
+    print("Budget\tFailures\tFailure Rate\tFragmented\tBlocks Moved\tI/O Cost")
+    print("-" * 75)
+    for row in rows:
+        print(f"{row['budget']}\t{row['failures']}/{row['allocations']}\t\t"
+              f"{row['failure_rate']:.2%}\t\t{row['fragmentation_failures']}\t\t"
+              f"{row['blocks_moved']}\t\t{row['io_cost']}")
+
+if __name__ == "__main__":
+    workload = generate_workload(100000, 10000, max_length=2000, free_ratio=0.5, seed=1)
+    print_tradeoff(compaction_tradeoff(100000, workload))
@@ -0,0 +1,261 @@
+"""
+Memory-mapped persistent disk image for the file allocation simulators
+
+Layout (header and directory integers are little-endian):
+
+* a 64-byte header: magic ``DIMG``, version, total blocks, directory
+  capacity, pointer table capacity and pointers used
+* the block bitmap in BlockMap format, padded to 8 bytes
+* the directory table: fixed 64-byte entries of name (32 bytes, UTF-8),
+  kind (0 = empty, 1 = contiguous, 2 = indexed), indirect block count,
+  first block (start or index block), block count and an offset into the
+  pointer table
+* the pointer table: uint64 block numbers of indexed files, the data blocks
+  followed by any indirect index blocks (native byte order)
+
+The file is opened with ``mmap``, so opening a large image costs nothing
+up front, updates are written in place, and images opened with
+``readonly=True`` share the page cache between processes without copying.
+"""
+
+import mmap
+import os
+import struct
+from array import array
+
+from block_map import BlockMap
+
+IMAGE_MAGIC = b'DIMG'
+IMAGE_VERSION = 1
+HEADER = struct.Struct('<4sHHQQQQ')
+HEADER_SIZE = 64
+DIR_ENTRY = struct.Struct('<32sB3xIQQQ')
+NAME_SIZE = 32
+
+EMPTY, CONTIGUOUS, INDEXED = 0, 1, 2
+KIND_NAMES = {CONTIGUOUS: 'contiguous', INDEXED: 'indexed'}
+
+def _layout(total_blocks, max_files):
+    """Byte offsets of the bitmap, directory and pointer table"""
+    bitmap_offset = HEADER_SIZE
+    bitmap_size = ((total_blocks + 7) // 8 + 7) & ~7
+    directory_offset = bitmap_offset + bitmap_size
+    pointer_offset = directory_offset + max_files * DIR_ENTRY.size
+    return bitmap_offset, bitmap_size, directory_offset, pointer_offset
+
+class DiskImage:
+    """A disk image file mapped into memory. Use create() or open()."""
+
+    def __init__(self, path, readonly=False):
+        self.path = path
+        self.readonly = readonly
+        self._file = open(path, 'rb' if readonly else 'r+b')
+        access = mmap.ACCESS_READ if readonly else mmap.ACCESS_WRITE
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=access)
+        self._view = memoryview(self._mmap)
+
+        magic, version, _, total_blocks, max_files, max_pointers, pointers_used = \
+            HEADER.unpack_from(self._mmap, 0)
+        if magic != IMAGE_MAGIC:
+            self.close()
+            raise ValueError(f"{path}: not a disk image (magic {magic!r})")
+        if version != IMAGE_VERSION:
+            self.close()
+            raise ValueError(f"{path}: unsupported disk image version {version}")
+
+        self.total_blocks = total_blocks
+        self.max_files = max_files
+        self.max_pointers = max_pointers
+        self._pointers_used = pointers_used
+        bitmap_offset, bitmap_size, self._directory_offset, pointer_offset = \
+            _layout(total_blocks, max_files)
+        self.bitmap = self._view[bitmap_offset:bitmap_offset + bitmap_size]
+        self.pointers = self._view[pointer_offset:pointer_offset + 8 * max_pointers].cast('Q')
+        self._block_map = None
+
+        # Name -> directory slot; the table is small next to the bitmap
+        self._slots = {}
+        self._free_slots = []
+        for slot in range(max_files - 1, -1, -1):
+            name, kind, _, _, _, _ = DIR_ENTRY.unpack_from(self._mmap, self._entry_offset(slot))
+            if kind == EMPTY:
+                self._free_slots.append(slot)
+            else:
+                self._slots[name.rstrip(b'\0').decode()] = slot
+
+    @classmethod
+    def create(cls, path, total_blocks, max_files=1024, max_pointers=0):
+        """Create a new image with every block free and an empty directory"""
+        _, _, _, pointer_offset = _layout(total_blocks, max_files)
+        size = pointer_offset + 8 * max_pointers
+        with open(path, 'wb') as f:
+            # Sparse file: only pages that are written take disk space
+            f.truncate(size)
+            f.write(HEADER.pack(IMAGE_MAGIC, IMAGE_VERSION, 0, total_blocks,
+                                max_files, max_pointers, 0))
+            if total_blocks & 7:
+                # Padding bits after the last block stay allocated
+                f.seek(HEADER_SIZE + total_blocks // 8)
+                f.write(bytes([0xFF & ~((1 << (total_blocks & 7)) - 1)]))
+        return cls(path)
+
+    @classmethod
+    def open(cls, path, readonly=False):
+        return cls(path, readonly=readonly)
+
+    def _entry_offset(self, slot):
+        return self._directory_offset + slot * DIR_ENTRY.size
+
+    def _check_writable(self):
+        if self.readonly:
+            raise ValueError(f"{self.path} is open read-only")
+
+    @property
+    def block_map(self):
+        """BlockMap over the mapped bitmap, built on first use"""
+        if self._block_map is None:
+            self._block_map = BlockMap(self.total_blocks, self.bitmap)
+        return self._block_map
+
+    def is_allocated(self, block):
+        return bool(self.bitmap[block >> 3] >> (block & 7) & 1)
+
+    # Directory
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, name):
+        return name in self._slots
+
+    def _add_entry(self, name, kind, first_block, block_count, pointer_offset=0, indirect_count=0):
+        encoded = name.encode()
+        if len(encoded) > NAME_SIZE:
+            raise ValueError(f"file name '{name}' is longer than {NAME_SIZE} bytes")
+        if name in self._slots:
+            raise ValueError(f"file '{name}' already exists")
+        if not self._free_slots:
+            raise ValueError(f"directory is full ({self.max_files} files)")
+        slot = self._free_slots.pop()
+        DIR_ENTRY.pack_into(self._mmap, self._entry_offset(slot), encoded, kind,
+                            indirect_count, first_block, block_count, pointer_offset)
+        self._slots[name] = slot
+
+    def add_contiguous_file(self, name, start, length):
+        """Allocate blocks [start, start + length) and record the file;
+        return False if the range is not free"""
+        self._check_writable()
+        if name in self._slots:
+            raise ValueError(f"file '{name}' already exists")
+        if not self.block_map.allocate_at(start, length):
+            return False
+        self._add_entry(name, CONTIGUOUS, start, length)
+        return True
+
+    def add_indexed_file(self, name, index_block, data_blocks):
+        """Allocate an index block plus data blocks and record the file;
+        return False if any of them is out of range or not free"""
+        self._check_writable()
+        if name in self._slots:
+            raise ValueError(f"file '{name}' already exists")
+        if self._pointers_used + len(data_blocks) > self.max_pointers:
+            raise ValueError(f"pointer table is full ({self.max_pointers} pointers)")
+        block_map = self.block_map
+        blocks = [index_block, *data_blocks]
+        if len(set(blocks)) != len(blocks):
+            return False
+        if any(not 0 <= block < self.total_blocks or block_map.is_allocated(block) for block in blocks):
+            return False
+        for block in blocks:
+            block_map.allocate_at(block, 1)
+        self.record_indexed_file(name, index_block, data_blocks)
+        return True
+
+    @property
+    def pointers_free(self):
+        """Pointer table entries still available to new indexed files"""
+        return self.max_pointers - self._pointers_used
+
+    def record_indexed_file(self, name, index_block, data_blocks, indirect_blocks=()):
+        """Record an indexed file whose blocks are already allocated in the
+        bitmap (e.g. by an InodeTable sharing this image's block map)"""
+        self._check_writable()
+        pointers = [*data_blocks, *indirect_blocks]
+        if self._pointers_used + len(pointers) > self.max_pointers:
+            raise ValueError(f"pointer table is full ({self.max_pointers} pointers)")
+        offset = self._pointers_used
+        self.pointers[offset:offset + len(pointers)] = array('Q', pointers)
+        self._pointers_used += len(pointers)
+        struct.pack_into('<Q', self._mmap, HEADER.size - 8, self._pointers_used)
+        self._add_entry(name, INDEXED, index_block, len(data_blocks), offset, len(indirect_blocks))
+
+    def remove_file(self, name):
+        """Free a file's blocks and clear its directory entry. Pointer table
+        space of indexed files is not reused."""
+        self._check_writable()
+        slot = self._slots.pop(name)
+        _, kind, indirect_count, first_block, block_count, offset = DIR_ENTRY.unpack_from(
+            self._mmap, self._entry_offset(slot))
+        block_map = self.block_map
+        if kind == CONTIGUOUS:
+            block_map.free(first_block, block_count)
+        else:
+            block_map.free(first_block, 1)
+            for block in self.pointers[offset:offset + block_count + indirect_count]:
+                block_map.free(block, 1)
+        self._view[self._entry_offset(slot):self._entry_offset(slot) + DIR_ENTRY.size] = bytes(DIR_ENTRY.size)
+        self._free_slots.append(slot)
+
+    def file(self, name):
+        """(kind, first_block, block_count, data_blocks) for a file, where
+        data_blocks is a zero-copy view for indexed files and None otherwise"""
+        slot = self._slots[name]
+        _, kind, _, first_block, block_count, offset = DIR_ENTRY.unpack_from(
+            self._mmap, self._entry_offset(slot))
+        data_blocks = self.pointers[offset:offset + block_count] if kind == INDEXED else None
+        return kind, first_block, block_count, data_blocks
+
+    def indirect_blocks(self, name):
+        """Zero-copy view of the indirect index blocks of an indexed file"""
+        slot = self._slots[name]
+        _, kind, indirect_count, _, block_count, offset = DIR_ENTRY.unpack_from(
+            self._mmap, self._entry_offset(slot))
+        start = offset + block_count
+        return self.pointers[start:start + indirect_count]
+
+    def files(self):
+        """Yield (name, kind, first_block, block_count, data_blocks) in
+        directory order"""
+        for name, slot in sorted(self._slots.items(), key=lambda item: item[1]):
+            yield (name, *self.file(name))
+
+    # Lifetime
+
+    def flush(self):
+        if not self.readonly:
+            self._mmap.flush()
+
+    def close(self):
+        if self._mmap is None:
+            return
+        self.flush()
+        self._block_map = None
+        for name in ('bitmap', 'pointers', '_view'):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+        self._mmap.close()
+        self._file.close()
+        self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def open_or_create(path, total_blocks, max_files=1024, max_pointers=0):
+    """Open ``path`` if it exists, otherwise create it with the given size"""
+    if os.path.exists(path):
+        return DiskImage.open(path)
+    return DiskImage.create(path, total_blocks, max_files, max_pointers)
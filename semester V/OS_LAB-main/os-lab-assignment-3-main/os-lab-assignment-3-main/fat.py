@@ -0,0 +1,250 @@
+"""
+Linked allocation with a File Allocation Table
+
+Each file is a chain of blocks: the directory keeps a file's first block
+and the FAT entry of every block holds the next block of the same file
+(END_OF_CHAIN after the last one, FREE when the block is not in a chain).
+The table is a single array('i') with one entry per disk block.
+
+Reading a file front to back is cheap, but seeking to byte offset b means
+following b // block_size links from the first block, so the table counts
+every link it follows (``hops``). A chain-walk cache keeps a checkpoint at
+every K-th link of a file, recorded as walks pass them. A seek starts from
+the nearest checkpoint at or before its target, so once a file has been
+walked a seek costs at most K - 1 hops instead of up to n.
+
+compare_access_methods() stores the same files contiguously, with inodes
+and as FAT chains, runs the same random seeks against each layout and
+reports the pointer reads and time per seek.
+"""
+
+import random
+import time
+from array import array
+
+from block_map import BlockMap
+from inode import InodeTable, block_runs
+
+FREE = -2
+END_OF_CHAIN = -1
+
+class LinkedFile:
+    __slots__ = ('name', 'first', 'last', 'length', 'checkpoints')
+
+    def __init__(self, name, first, last, length):
+        self.name = name
+        self.first = first
+        self.last = last
+        self.length = length  # blocks
+        self.checkpoints = array('i', [first])  # block at link 0, K, 2K, ...
+
+class FileAllocationTable:
+    """FAT chains over a BlockMap. ``checkpoint_interval`` is K for the
+    chain-walk cache; 0 turns the cache off."""
+
+    def __init__(self, block_map, block_size=512, checkpoint_interval=16):
+        if block_size <= 0 or checkpoint_interval < 0:
+            raise ValueError("need block_size > 0 and checkpoint_interval >= 0")
+        self.block_map = block_map
+        self.block_size = block_size
+        self.checkpoint_interval = checkpoint_interval
+        self.table = array('i', [FREE]) * block_map.total_blocks
+        self.files = {}
+        self.hops = 0
+
+    def create_file(self, name, blocks):
+        """Allocate ``blocks`` and chain them in the given order. Returns the
+        LinkedFile, or None if a block is out of range, repeated or not free."""
+        if name in self.files:
+            raise ValueError(f"file '{name}' already exists")
+        block_map = self.block_map
+        if not blocks or len(set(blocks)) != len(blocks):
+            return None
+        try:
+            block_map.allocate_runs(block_runs(blocks))
+        except ValueError:
+            return None
+
+        table = self.table
+        for block, following in zip(blocks, blocks[1:]):
+            table[block] = following
+        table[blocks[-1]] = END_OF_CHAIN
+        linked = self.files[name] = LinkedFile(name, blocks[0], blocks[-1], len(blocks))
+        return linked
+
+    def allocate_file(self, name, start, length):
+        """Chain ``length`` blocks from ``start``, taking the next free blocks
+        after it and wrapping around to block 0. Returns the LinkedFile, or
+        None if ``start`` is not free or too few blocks are free."""
+        block_map = self.block_map
+        if length <= 0 or not 0 <= start < block_map.total_blocks or block_map.is_allocated(start):
+            return None
+        if block_map.free_blocks < length:
+            return None
+        blocks = []
+        for low, high in ((start, block_map.total_blocks), (0, start)):
+            for extent_start, extent_length in block_map.free_extents():
+                if extent_start >= high or len(blocks) == length:
+                    break
+                first = max(extent_start, low)
+                stop = min(extent_start + extent_length, high, first + length - len(blocks))
+                blocks.extend(range(first, stop))
+        return self.create_file(name, blocks)
+
+    def append_block(self, name, block):
+        """Link a free block to the end of a file; False if it is not free"""
+        linked = self.files[name]
+        if not self.block_map.allocate_at(block, 1):
+            return False
+        self.table[linked.last] = block
+        self.table[block] = END_OF_CHAIN
+        linked.last = block
+        linked.length += 1
+        return True
+
+    def remove_file(self, name):
+        """Free every block in a file's chain"""
+        blocks = self.chain(name)
+        del self.files[name]
+        for block in blocks:
+            self.table[block] = FREE
+        for start, length in block_runs(blocks):
+            self.block_map.free(start, length)
+
+    def chain(self, name):
+        """Blocks of a file in chain order (a sequential read, not counted
+        as hops)"""
+        table = self.table
+        block = self.files[name].first
+        blocks = []
+        while block != END_OF_CHAIN:
+            blocks.append(block)
+            block = table[block]
+        return blocks
+
+    def locate(self, name, logical, use_cache=True):
+        """Physical block of logical block ``logical`` of a file, following
+        links from the nearest checkpoint (or the first block)"""
+        linked = self.files[name]
+        if not 0 <= logical < linked.length:
+            raise IndexError(f"block {logical} is past the end of '{name}' ({linked.length} blocks)")
+        interval = self.checkpoint_interval if use_cache else 0
+        checkpoints = linked.checkpoints
+        if interval:
+            index = min(logical // interval, len(checkpoints) - 1)
+            block, position = checkpoints[index], index * interval
+        else:
+            block, position = linked.first, 0
+        self.hops += logical - position
+        table = self.table
+        if not interval:
+            for _ in range(logical - position):
+                block = table[block]
+            return block
+        next_checkpoint = len(checkpoints) * interval
+        while position < logical:
+            block = table[block]
+            position += 1
+            if position == next_checkpoint:
+                # First walk past this link: remember it
+                checkpoints.append(block)
+                next_checkpoint += interval
+        return block
+
+    def seek(self, name, offset, use_cache=True):
+        """Physical block holding byte ``offset`` of a file"""
+        return self.locate(name, offset // self.block_size, use_cache)
+
+    def describe(self, block):
+        """The FAT entry of a block as text"""
+        entry = self.table[block]
+        if entry == FREE:
+            return "-"
+        return "EOC" if entry == END_OF_CHAIN else str(entry)
+
+def compare_access_methods(total_blocks, file_lengths, accesses=10000, block_size=512,
+                           checkpoint_interval=16, seed=None):
+    """Store the same files contiguously, with inodes and as FAT chains
+    (with and without the chain-walk cache), then run the same random
+    seeks on each. Returns a row per method with the average and maximum
+    pointer reads per seek (index or FAT entries read) and the time per
+    seek. Indexed and linked files get the same scattered data blocks."""
+    rng = random.Random(seed)
+    names = [f"F{i}" for i in range(1, len(file_lengths) + 1)]
+    inodes = InodeTable(BlockMap(total_blocks))
+    # Indirect blocks are allocated first-fit, so keep the lowest blocks for them
+    direct, single = inodes.direct_pointers, inodes.direct_pointers + inodes.pointers_per_block
+    reserved = sum(0 if length <= direct else 1 if length <= single
+                   else 2 + -(-(length - single) // inodes.pointers_per_block) for length in file_lengths)
+    if reserved + sum(file_lengths) + len(file_lengths) > total_blocks:
+        raise ValueError("files do not fit on the disk")
+    scattered = [reserved + block for block in
+                 rng.sample(range(total_blocks - reserved), sum(file_lengths) + len(file_lengths))]
+    inode_blocks, scattered = scattered[:len(file_lengths)], scattered[len(file_lengths):]
+    file_blocks = []
+    position = 0
+    for length in file_lengths:
+        file_blocks.append(scattered[position:position + length])
+        position += length
+    seeks = []
+    for _ in range(accesses):
+        i = rng.randrange(len(names))
+        seeks.append((i, rng.randrange(file_lengths[i] * block_size)))
+
+    rows = []
+
+    # Contiguous: start + offset // block_size, no pointers to read
+    block_map = BlockMap(total_blocks)
+    starts = [block_map.allocate(length) for length in file_lengths]
+    if None in starts:
+        raise ValueError("files do not fit contiguously")
+    located = []
+    began = time.perf_counter()
+    for i, offset in seeks:
+        located.append(starts[i] + offset // block_size)
+    rows.append(('Contiguous', 0.0, 0, time.perf_counter() - began))
+
+    # Indexed: one pointer read per level of the inode's pointer tree
+    for name, inode_block, blocks in zip(names, inode_blocks, file_blocks):
+        inodes.create_file(name, inode_block, blocks)
+    reads = deepest = 0
+    indexed = []
+    began = time.perf_counter()
+    for i, offset in seeks:
+        logical = offset // block_size
+        indexed.append(inodes.lookup(names[i], logical))
+        depth = 1 if logical < direct else 2 if logical < single else 3
+        reads += depth
+        deepest = max(deepest, depth)
+    rows.append(('Indexed (inode)', reads / accesses, deepest, time.perf_counter() - began))
+
+    # Linked: one FAT entry read per link followed
+    for label, interval in (('Linked (FAT)', 0), (f'Linked (FAT, cache every {checkpoint_interval})', checkpoint_interval)):
+        fat = FileAllocationTable(BlockMap(total_blocks), block_size, interval)
+        for name, blocks in zip(names, file_blocks):
+            fat.create_file(name, blocks)
+        deepest = 0
+        located = []
+        began = time.perf_counter()
+        for i, offset in seeks:
+            before = fat.hops
+            located.append(fat.seek(names[i], offset))
+            deepest = max(deepest, fat.hops - before)
+        if located != indexed:
+            raise RuntimeError(f"{label} and the inodes disagree on a block")
+        rows.append((label, fat.hops / accesses, deepest, time.perf_counter() - began))
+
+    return [{'method': method, 'avg_reads': avg_reads, 'max_reads': max_reads,
+             'us_per_seek': elapsed / accesses * 1e6}
+            for method, avg_reads, max_reads, elapsed in rows]
+
+def print_access_comparison(rows):
+    print("Method\t\t\t\tAvg Reads\tMax Reads\tTime/Seek (us)")
+    print("-" * 75)
+    for row in rows:
+        print(f"{row['method']:<32}{row['avg_reads']:.2f}\t\t{row['max_reads']}\t\t{row['us_per_seek']:.2f}")
+
+if __name__ == "__main__":
+    rng = random.Random(1)
+    lengths = [rng.randint(1, 2000) for _ in range(100)]
+    print_access_comparison(compare_access_methods(250_000, lengths, accesses=20000, seed=1))
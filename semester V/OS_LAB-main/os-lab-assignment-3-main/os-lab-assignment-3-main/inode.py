@@ -0,0 +1,316 @@
+"""
+Inode-style indexed allocation with a reverse block map
+
+Each file has an inode block holding ``direct_pointers`` data block
+pointers, one single-indirect pointer and one double-indirect pointer, as in
+the classic UNIX layout. An index block holds ``pointers_per_block``
+pointers, so a file can have at most D + P + P^2 data blocks. Mapping a
+logical block to a physical block touches at most three pointer arrays.
+
+The reverse map answers "who owns block b, and at which offset?" in O(1).
+It is paged: an owner page and an offset page (array('i'), 8 bytes per
+block in all) are only created for 64K-block regions that hold allocated
+blocks, so a sparsely used 10^8-block disk costs memory for its used
+regions only. Offsets >= 0 are logical data block numbers; metadata blocks
+use the negative codes below.
+"""
+
+from array import array
+
+INODE_BLOCK = -1
+SINGLE_INDIRECT = -2
+DOUBLE_INDIRECT = -3
+DOUBLE_LEAF = -4  # -4 - k for the k-th second-level block of the double-indirect tree
+
+PAGE_SHIFT = 16
+PAGE_SIZE = 1 << PAGE_SHIFT
+
+def block_runs(blocks):
+    """Coalesce block numbers into sorted (start, length) runs, so that a
+    file's blocks can be marked or freed with one bitmap update per run"""
+    runs = []
+    for block in sorted(blocks):
+        if runs and runs[-1][0] + runs[-1][1] == block:
+            runs[-1][1] += 1
+        else:
+            runs.append([block, 1])
+    return runs
+
+class Inode:
+    __slots__ = ('number', 'name', 'block', 'size', 'direct', 'single_indirect', 'double_indirect')
+
+    def __init__(self, number, name, block, direct_pointers):
+        self.number = number
+        self.name = name
+        self.block = block
+        self.size = 0  # data blocks
+        self.direct = array('q', [-1]) * direct_pointers
+        self.single_indirect = -1
+        self.double_indirect = -1
+
+class InodeTable:
+    """Files as inodes over a BlockMap. Index block contents are kept in
+    ``index_blocks`` (block -> array of pointers)."""
+
+    def __init__(self, block_map, direct_pointers=12, pointers_per_block=256):
+        if direct_pointers < 0 or pointers_per_block < 1:
+            raise ValueError("need direct_pointers >= 0 and pointers_per_block >= 1")
+        self.block_map = block_map
+        self.direct_pointers = direct_pointers
+        self.pointers_per_block = pointers_per_block
+        self.max_file_blocks = direct_pointers + pointers_per_block + pointers_per_block ** 2
+        self.inodes = {}  # number -> Inode
+        self.by_name = {}
+        self.index_blocks = {}
+        self._next_number = 0
+        self._owner_pages = {}
+        self._offset_pages = {}
+        self._page_counts = {}
+
+    # Reverse map
+
+    def _set_owner(self, block, number, offset):
+        page = block >> PAGE_SHIFT
+        owners = self._owner_pages.get(page)
+        if owners is None:
+            owners = self._owner_pages[page] = array('i', [-1]) * PAGE_SIZE
+            self._offset_pages[page] = array('i', [0]) * PAGE_SIZE
+            self._page_counts[page] = 0
+        if owners[block & (PAGE_SIZE - 1)] == -1:
+            self._page_counts[page] += 1
+        owners[block & (PAGE_SIZE - 1)] = number
+        self._offset_pages[page][block & (PAGE_SIZE - 1)] = offset
+
+    def _clear_owner(self, block):
+        page = block >> PAGE_SHIFT
+        self._owner_pages[page][block & (PAGE_SIZE - 1)] = -1
+        self._page_counts[page] -= 1
+        if not self._page_counts[page]:
+            # Drop pages that no longer hold any owned block
+            del self._owner_pages[page]
+            del self._offset_pages[page]
+            del self._page_counts[page]
+
+    def owner_of(self, block):
+        """(inode, offset) of the file that owns ``block``, or None. Offset
+        is the logical block number, or a negative metadata code."""
+        page = block >> PAGE_SHIFT
+        owners = self._owner_pages.get(page)
+        if owners is None or owners[block & (PAGE_SIZE - 1)] == -1:
+            return None
+        return (self.inodes[owners[block & (PAGE_SIZE - 1)]],
+                self._offset_pages[page][block & (PAGE_SIZE - 1)])
+
+    def reverse_map_bytes(self):
+        return sum(page.itemsize * len(page) for page in self._owner_pages.values()) * 2
+
+    # Pointer tree
+
+    def _new_index_block(self, inode, code, spare_blocks):
+        """Take an index block from ``spare_blocks`` (already allocated) or
+        allocate one first-fit; -1 if the disk is full"""
+        block = spare_blocks.pop() if spare_blocks else self.block_map.allocate(1)
+        if block is None:
+            return -1
+        self.index_blocks[block] = array('q', [-1]) * self.pointers_per_block
+        self._set_owner(block, inode.number, code)
+        return block
+
+    def _set_pointer(self, inode, logical, block, spare_blocks=None):
+        """Point logical data block ``logical`` at ``block``, creating
+        indirect blocks as needed. Returns False if one cannot be allocated."""
+        D, P = self.direct_pointers, self.pointers_per_block
+        if logical < D:
+            inode.direct[logical] = block
+        elif logical < D + P:
+            if inode.single_indirect == -1:
+                inode.single_indirect = self._new_index_block(inode, SINGLE_INDIRECT, spare_blocks)
+                if inode.single_indirect == -1:
+                    return False
+            self.index_blocks[inode.single_indirect][logical - D] = block
+        elif logical < self.max_file_blocks:
+            leaf_index, slot = divmod(logical - D - P, P)
+            if inode.double_indirect == -1:
+                inode.double_indirect = self._new_index_block(inode, DOUBLE_INDIRECT, spare_blocks)
+                if inode.double_indirect == -1:
+                    return False
+            top = self.index_blocks[inode.double_indirect]
+            if top[leaf_index] == -1:
+                top[leaf_index] = self._new_index_block(inode, DOUBLE_LEAF - leaf_index, spare_blocks)
+                if top[leaf_index] == -1:
+                    return False
+            self.index_blocks[top[leaf_index]][slot] = block
+        else:
+            raise ValueError(f"file would exceed {self.max_file_blocks} blocks")
+        self._set_owner(block, inode.number, logical)
+        return True
+
+    def lookup(self, name, logical):
+        """Physical block of logical block ``logical`` of a file, in O(depth)"""
+        inode = self.by_name[name]
+        if not 0 <= logical < inode.size:
+            raise IndexError(f"block {logical} is past the end of '{name}' ({inode.size} blocks)")
+        D, P = self.direct_pointers, self.pointers_per_block
+        if logical < D:
+            return inode.direct[logical]
+        if logical < D + P:
+            return self.index_blocks[inode.single_indirect][logical - D]
+        leaf_index, slot = divmod(logical - D - P, P)
+        return self.index_blocks[self.index_blocks[inode.double_indirect][leaf_index]][slot]
+
+    def data_blocks(self, name):
+        """All data blocks of a file in logical order"""
+        return self._data_blocks(self.by_name[name])
+
+    def _data_blocks(self, inode):
+        D, P = self.direct_pointers, self.pointers_per_block
+        blocks = inode.direct[:min(inode.size, D)].tolist()
+        remaining = inode.size - len(blocks)
+        if remaining > 0:
+            blocks.extend(self.index_blocks[inode.single_indirect][:min(remaining, P)])
+            remaining -= min(remaining, P)
+        if remaining > 0:
+            for leaf in self.index_blocks[inode.double_indirect]:
+                if remaining <= 0:
+                    break
+                blocks.extend(self.index_blocks[leaf][:min(remaining, P)])
+                remaining -= P
+        return blocks
+
+    def indirect_blocks(self, name):
+        """Index blocks used by a file besides its inode block, in the order
+        create_file() allocates them"""
+        return self._indirect_blocks(self.by_name[name])
+
+    def _indirect_blocks(self, inode):
+        blocks = []
+        if inode.single_indirect != -1:
+            blocks.append(inode.single_indirect)
+        if inode.double_indirect != -1:
+            blocks.append(inode.double_indirect)
+            blocks.extend(leaf for leaf in self.index_blocks[inode.double_indirect] if leaf != -1)
+        return blocks
+
+    def indirect_blocks_needed(self, length):
+        """Number of index blocks besides the inode block that a file of
+        ``length`` data blocks uses"""
+        D, P = self.direct_pointers, self.pointers_per_block
+        if length <= D:
+            return 0
+        if length <= D + P:
+            return 1
+        return 2 + -(-(length - D - P) // P)
+
+    # Files
+
+    def create_file(self, name, inode_block, data_blocks, indirect_blocks=None):
+        """Allocate an inode block and data blocks for a new file and build
+        its pointer tree. Indirect blocks are allocated first-fit, unless
+        ``indirect_blocks`` lists blocks that are already allocated for
+        them (when reloading a saved disk). Returns the Inode, or None if a
+        block is out of range or not free."""
+        if name in self.by_name:
+            raise ValueError(f"file '{name}' already exists")
+        if len(data_blocks) > self.max_file_blocks:
+            raise ValueError(f"file would exceed {self.max_file_blocks} blocks")
+        block_map = self.block_map
+        reloading = indirect_blocks is not None
+        if not reloading:
+            blocks = [inode_block, *data_blocks]
+            if len(set(blocks)) != len(blocks):
+                return None
+            try:
+                block_map.allocate_runs(block_runs(blocks))
+            except ValueError:
+                return None
+
+        inode = Inode(self._next_number, name, inode_block, self.direct_pointers)
+        self._next_number += 1
+        self.inodes[inode.number] = inode
+        self.by_name[name] = inode
+        self._set_owner(inode_block, inode.number, INODE_BLOCK)
+        # Reloaded indirect blocks are handed out in the order they were saved
+        spare = list(reversed(indirect_blocks)) if reloading else None
+        if not self._fill(inode, data_blocks, spare):
+            # No room for an index block: undo the whole file
+            for start, length in block_runs(data_blocks[inode.size:]):
+                block_map.free(start, length)
+            self.remove_file(name)
+            return None
+        return inode
+
+    def _fill(self, inode, data_blocks, spare_blocks):
+        """Write the pointer tree of a new file one index block at a time"""
+        D, P = self.direct_pointers, self.pointers_per_block
+        number = inode.number
+        set_owner = self._set_owner
+        position = 0
+        while position < len(data_blocks):
+            if position < D:
+                target, slot, count = inode.direct, position, D - position
+            elif position < D + P:
+                if inode.single_indirect == -1:
+                    inode.single_indirect = self._new_index_block(inode, SINGLE_INDIRECT, spare_blocks)
+                    if inode.single_indirect == -1:
+                        return False
+                target, slot, count = self.index_blocks[inode.single_indirect], position - D, D + P - position
+            else:
+                leaf_index, slot = divmod(position - D - P, P)
+                if inode.double_indirect == -1:
+                    inode.double_indirect = self._new_index_block(inode, DOUBLE_INDIRECT, spare_blocks)
+                    if inode.double_indirect == -1:
+                        return False
+                top = self.index_blocks[inode.double_indirect]
+                if top[leaf_index] == -1:
+                    top[leaf_index] = self._new_index_block(inode, DOUBLE_LEAF - leaf_index, spare_blocks)
+                    if top[leaf_index] == -1:
+                        return False
+                target, count = self.index_blocks[top[leaf_index]], P - slot
+            chunk = data_blocks[position:position + count]
+            target[slot:slot + len(chunk)] = array('q', chunk)
+            for logical, block in enumerate(chunk, position):
+                set_owner(block, number, logical)
+            position += len(chunk)
+            inode.size = position
+        return True
+
+    def append_block(self, name, block):
+        """Grow a file by one data block at the end; False if the block is
+        not free or no index block can be allocated for it"""
+        inode = self.by_name[name]
+        if inode.size >= self.max_file_blocks:
+            raise ValueError(f"file would exceed {self.max_file_blocks} blocks")
+        if not self.block_map.allocate_at(block, 1):
+            return False
+        if not self._set_pointer(inode, inode.size, block):
+            self.block_map.free(block, 1)
+            return False
+        inode.size += 1
+        return True
+
+    def remove_file(self, name):
+        """Free every block of a file: data, index and inode blocks"""
+        inode = self.by_name.pop(name)
+        del self.inodes[inode.number]
+        blocks = self._data_blocks(inode) + [inode.block] + self._indirect_blocks(inode)
+        for block in blocks:
+            self._clear_owner(block)
+            self.index_blocks.pop(block, None)
+        for start, length in block_runs(blocks):
+            self.block_map.free(start, length)
+
+    def describe(self, block):
+        """Human-readable purpose of a block, from the reverse map"""
+        owner = self.owner_of(block)
+        if owner is None:
+            return "Data Block" if self.block_map.is_allocated(block) else "-"
+        inode, offset = owner
+        if offset >= 0:
+            return "Data Block"
+        if offset == INODE_BLOCK:
+            return f"Index Block (points to {self._data_blocks(inode)})"
+        if offset == SINGLE_INDIRECT:
+            return f"Single-Indirect Block of {inode.name}"
+        if offset == DOUBLE_INDIRECT:
+            return f"Double-Indirect Block of {inode.name}"
+        return f"Double-Indirect Leaf {DOUBLE_LEAF - offset} of {inode.name}"
@@ -0,0 +1,237 @@
+"""
+Indexed partition allocator for first-fit, best-fit and worst-fit
+
+Task 4 places each process into a partition and leaves the rest of the
+partition free for later processes, so one partition can hold several of
+them. Scanning every partition for every process costs O(P x N). The
+allocator here keeps the remaining space of every partition in an index
+built for the strategy, so each placement costs O(log P):
+
+* first-fit: a max segment tree over the remaining sizes. The leftmost
+  partition with at least k units free is found by walking down from the
+  root, always taking the left child when its maximum is large enough.
+* best-fit: a sorted index of (remaining, partition) pairs searched with
+  bisect; the ceiling of (k, -1) is the smallest partition that fits.
+* worst-fit: a heap of (-remaining, partition). Only the top entry is ever
+  shrunk, so it is replaced in place and the heap never holds stale entries.
+
+Ties go to the lowest partition number, as in the original loops, so every
+strategy gives exactly the same placements as its O(P x N) version.
+
+AllocationResult inverts an allocation list into partition -> processes in
+one pass, so the layout printer and the per-partition statistics (used,
+free, internal fragmentation) run in O(P + N) and show every process of a
+shared partition.
+"""
+
+import heapq
+import random
+import sys
+import time
+from collections import namedtuple
+
+from block_map import _SortedPairs
+
+STRATEGIES = ('first', 'best', 'worst')
+
+class _FirstFitIndex:
+    """Max segment tree over the remaining size of every partition"""
+
+    def __init__(self, sizes):
+        leaves = 1
+        while leaves < len(sizes):
+            leaves *= 2
+        tree = [-1] * leaves + list(sizes) + [-1] * (leaves - len(sizes))
+        for node in range(leaves - 1, 0, -1):
+            left, right = tree[2 * node], tree[2 * node + 1]
+            tree[node] = left if left >= right else right
+        self.leaves = leaves
+        self.tree = tree
+
+    def take(self, size):
+        tree = self.tree
+        if tree[1] < size:
+            return -1
+        node, leaves = 1, self.leaves
+        while node < leaves:
+            node *= 2
+            if tree[node] < size:
+                node += 1
+        remaining = tree[node] - size
+        tree[node] = remaining
+        partition = node - leaves
+        node //= 2
+        while node:
+            left, right = tree[2 * node], tree[2 * node + 1]
+            largest = left if left >= right else right
+            if tree[node] == largest:
+                break
+            tree[node] = largest
+            node //= 2
+        return partition
+
+class _BestFitIndex:
+    """Sorted (remaining, partition) pairs"""
+
+    def __init__(self, sizes):
+        self.pairs = _SortedPairs((size, i) for i, size in enumerate(sizes))
+
+    def take(self, size):
+        pair = self.pairs.ceiling((size, -1))
+        if pair is None:
+            return -1
+        self.pairs.remove(pair)
+        self.pairs.add((pair[0] - size, pair[1]))
+        return pair[1]
+
+class _WorstFitIndex:
+    """Heap of (-remaining, partition): the top is the largest partition"""
+
+    def __init__(self, sizes):
+        self.heap = [(-size, i) for i, size in enumerate(sizes)]
+        heapq.heapify(self.heap)
+
+    def take(self, size):
+        heap = self.heap
+        if not heap or -heap[0][0] < size:
+            return -1
+        largest, partition = heap[0]
+        heapq.heapreplace(heap, (largest + size, partition))
+        return partition
+
+_INDEXES = {'first': _FirstFitIndex, 'best': _BestFitIndex, 'worst': _WorstFitIndex}
+
+class PartitionAllocator:
+    """Remaining space of a set of partitions under one placement strategy"""
+
+    def __init__(self, partitions, strategy='first'):
+        if strategy not in _INDEXES:
+            raise ValueError(f"unknown strategy '{strategy}', expected one of {STRATEGIES}")
+        if any(size < 0 for size in partitions):
+            raise ValueError("partition sizes must be non-negative")
+        self.strategy = strategy
+        self.remaining = list(partitions)
+        self._index = _INDEXES[strategy](self.remaining)
+
+    def allocate(self, size):
+        """Place a process of ``size`` units; return its partition number
+        (0-based) or -1 if no partition has room"""
+        partition = self._index.take(size)
+        if partition != -1:
+            self.remaining[partition] -= size
+        return partition
+
+    def allocate_all(self, processes):
+        """Place processes in order; return the allocation list (-1 for a
+        process that could not be placed)"""
+        take = self._index.take
+        remaining = self.remaining
+        allocation = []
+        for size in processes:
+            partition = take(size)
+            if partition != -1:
+                remaining[partition] -= size
+            allocation.append(partition)
+        return allocation
+
+PartitionStats = namedtuple('PartitionStats', 'size used free internal_fragmentation')
+
+class AllocationResult:
+    """Placements of one run, indexed by partition. ``allocation[j]`` is the
+    partition (0-based) of process j, or -1 if it was not placed."""
+
+    def __init__(self, partitions, processes, allocation):
+        if len(allocation) != len(processes):
+            raise ValueError("need one allocation entry per process")
+        self.partitions = partitions
+        self.processes = processes
+        self.allocation = allocation
+        self.members = {}  # partition -> process numbers, in placement order
+        self.used = [0] * len(partitions)
+        self.rejected = 0
+        members, used = self.members, self.used
+        for process, (size, partition) in enumerate(zip(processes, allocation)):
+            if partition == -1:
+                self.rejected += 1
+                continue
+            if partition in members:
+                members[partition].append(process)
+            else:
+                members[partition] = [process]
+            used[partition] += size
+
+    def processes_in(self, partition):
+        """Process numbers (0-based) placed in a partition"""
+        return self.members.get(partition, [])
+
+    def stats(self, partition):
+        """Used and free space of a partition. Free space in a partition
+        that holds a process counts as internal fragmentation."""
+        size, used = self.partitions[partition], self.used[partition]
+        return PartitionStats(size, used, size - used, size - used if partition in self.members else 0)
+
+    def summary(self):
+        total, used = sum(self.partitions), sum(self.used)
+        internal = sum(self.partitions[i] - self.used[i] for i in self.members)
+        return {'total': total, 'used': used, 'free': total - used,
+                'internal_fragmentation': internal,
+                'partitions_used': len(self.members), 'partitions_free': len(self.partitions) - len(self.members),
+                'placed': len(self.processes) - self.rejected, 'rejected': self.rejected,
+                'utilization': used / total * 100 if total else 0.0}
+
+    def render_layout(self, out=None, batch=4096):
+        """Write one line per partition with its space and processes, in
+        linear time"""
+        out = sys.stdout if out is None else out
+        processes, members = self.processes, self.members
+        out.write("Partition#\tSize\tUsed\tFree\tStatus\n")
+        out.write("-" * 60 + "\n")
+        lines = []
+        for i, (size, used) in enumerate(zip(self.partitions, self.used)):
+            if i in members:
+                placed = ", ".join(f"Process {j+1} (Size: {processes[j]})" for j in members[i])
+                status = f"Allocated to {placed}"
+            else:
+                status = "Free"
+            lines.append(f"Partition {i+1}\t{size}\t{used}\t{size - used}\t{status}\n")
+            if len(lines) >= batch:
+                out.write("".join(lines))
+                lines.clear()
+        out.write("".join(lines))
+
+    def render_summary(self, out=None):
+        out = sys.stdout if out is None else out
+        summary = self.summary()
+        out.write(f"Processes placed: {summary['placed']}, rejected: {summary['rejected']}\n")
+        out.write(f"Partitions used: {summary['partitions_used']}, free: {summary['partitions_free']}\n")
+        out.write(f"Memory used: {summary['used']} of {summary['total']} ({summary['utilization']:.2f}%)\n")
+        out.write(f"Free memory: {summary['free']} (internal fragmentation: {summary['internal_fragmentation']})\n")
+
+def allocate(partitions, processes, strategy='first'):
+    """Allocation list for ``processes`` placed into ``partitions``"""
+    return PartitionAllocator(partitions, strategy).allocate_all(processes)
+
+def compare_strategies(partitions, processes):
+    """Run every strategy on the same workload. Returns a row per strategy
+    with the number of processes placed, the memory they use and the time
+    taken (index build included)."""
+    rows = []
+    for strategy in STRATEGIES:
+        began = time.perf_counter()
+        allocation = allocate(partitions, processes, strategy)
+        elapsed = time.perf_counter() - began
+        placed = [size for size, partition in zip(processes, allocation) if partition != -1]
+        rows.append({'strategy': strategy, 'placed': len(placed), 'rejected': len(processes) - len(placed),
+                     'used': sum(placed), 'seconds': elapsed})
+    return rows
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(1)
+    partitions = [rng.randint(100, 10_000) for _ in range(count)]
+    processes = [rng.randint(1, 5_000) for _ in range(count)]
+    print(f"{count} partitions x {count} processes")
+    print("Strategy\tPlaced\t\tRejected\tUsed\t\tTime (s)")
+    print("-" * 70)
+    for row in compare_strategies(partitions, processes):
+        print(f"{row['strategy']}\t\t{row['placed']}\t\t{row['rejected']}\t\t{row['used']}\t{row['seconds']:.2f}")
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Scheduler benchmark suite
+
+Runs CPUScheduler.fcfs/sjf/priority_scheduling/round_robin and the
+non-interactive cores of Assignment 3's task1_cpu_scheduling over random
+workloads of growing size, recording wall time, peak memory (tracemalloc)
+and scheduling events per second. An event is one dispatch (a process put
+on the CPU), counted the same way for every algorithm. Results are saved
+as JSON; --compare checks a new run against a saved baseline and flags
+regressions.
+
+Usage:
+    python benchmark_scheduling.py --output results.json
+    python benchmark_scheduling.py --sizes 100 1000 10000 --cases fcfs rr
+    python benchmark_scheduling.py --compare baseline.json results.json
+"""
+
+import argparse
+import importlib.machinery
+import importlib.util
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from task5_cpu_scheduling import CPUScheduler, Process
+
+TASK1_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..',
+                          'os-lab-assignment-3-main', 'os-lab-assignment-3-main',
+                          'task1_cpu_scheduling.py.txt')
+
+DEFAULT_SIZES = (10**2, 10**3, 10**4, 10**5, 10**6)
+
+def load_task1(path=TASK1_PATH):
+    """Import task1_cpu_scheduling from its .py.txt file"""
+    loader = importlib.machinery.SourceFileLoader('task1_cpu_scheduling', path)
+    spec = importlib.util.spec_from_loader(loader.name, loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return module
+
+def make_workload(size, seed=42):
+    """Deterministic (pid, arrival, burst, priority) rows, arrivals spread so the CPU is busy"""
+    rng = random.Random(seed)
+    return [(i + 1, rng.randint(0, size * 5), rng.randint(1, 10), rng.randint(1, 5)) for i in range(size)]
+
+def _scheduler_case(method, **kwargs):
+    def prepare(rows):
+        scheduler = CPUScheduler()
+        scheduler.processes = [Process(*row) for row in rows]
+        return scheduler
+    
+    def run(scheduler):
+        getattr(scheduler, method)(verbose=False, **kwargs)
+        # The Gantt chart merges back-to-back slices of one process, so count dispatches
+        return scheduler.gantt_chart.dispatches
+    return prepare, run
+
+def _task1_priority_case():
+    def prepare(rows):
+        return [row[2] for row in rows], [row[3] for row in rows]
+    
+    def run(workload):
+        gantt, _ = load_task1_cached().priority_schedule(*workload)
+        return len(gantt)
+    return prepare, run
+
+def _task1_rr_case(time_quantum):
+    def prepare(rows):
+        return [row[2] for row in rows]
+    
+    def run(bursts):
+        gantt, _ = load_task1_cached().round_robin_schedule(bursts, time_quantum)
+        return len(gantt)
+    return prepare, run
+
+_task1_module = None
+
+def load_task1_cached():
+    global _task1_module
+    if _task1_module is None:
+        _task1_module = load_task1()
+    return _task1_module
+
+# name -> (prepare(rows) -> workload, run(workload) -> dispatch count)
+CASES = {
+    'fcfs': _scheduler_case('fcfs'),
+    'sjf': _scheduler_case('sjf'),
+    'priority': _scheduler_case('priority_scheduling'),
+    'rr': _scheduler_case('round_robin', time_quantum=2),
+    'task1_priority': _task1_priority_case(),
+    'task1_rr': _task1_rr_case(time_quantum=2),
+}
+
+def run_case(name, size, measure_memory=True, seed=42):
+    """Time one case at one size; peak memory comes from a separate traced run
+    so tracemalloc overhead does not distort the wall time"""
+    prepare, run = CASES[name]
+    rows = make_workload(size, seed)
+    
+    workload = prepare(rows)
+    started = time.perf_counter()
+    events = run(workload)
+    wall_time = time.perf_counter() - started
+    
+    peak_memory = None
+    if measure_memory:
+        workload = prepare(rows)
+        tracemalloc.start()
+        try:
+            run(workload)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    
+    return {
+        'case': name,
+        'size': size,
+        'wall_time': wall_time,
+        'peak_memory': peak_memory,
+        'events': events,
+        'events_per_sec': events / wall_time if wall_time else None,
+    }
+
+def run_suite(cases=tuple(CASES), sizes=DEFAULT_SIZES, budget=30.0, measure_memory=True, seed=42):
+    """Run every case at every size. A size is skipped, along with all larger
+    ones, when even a linear projection from the previous run exceeds
+    ``budget`` seconds, so one slow case cannot stall the suite"""
+    results = []
+    for name in cases:
+        previous = None
+        for size in sorted(sizes):
+            if previous and previous['wall_time'] * size / previous['size'] > budget:
+                print(f"{name:15s} skipping sizes >= {size} (projected over {budget:.0f} s budget)")
+                break
+            result = run_case(name, size, measure_memory, seed)
+            previous = result
+            results.append(result)
+            memory = f"{result['peak_memory'] / 2**20:9.1f} MiB" if result['peak_memory'] is not None else "        -    "
+            print(f"{name:15s} {size:>9d}  {result['wall_time']:9.3f} s  {memory}  "
+                  f"{result['events_per_sec'] or 0:12.0f} events/s", flush=True)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+def compare(baseline, current, threshold=0.10, min_time=0.005):
+    """Return rows for cases present in both runs, with regressions flagged
+    when wall time or peak memory grew by more than ``threshold``. Timings
+    under ``min_time`` seconds in both runs are too noisy to flag."""
+    base = {(r['case'], r['size']): r for r in baseline['results']}
+    rows = []
+    for result in current['results']:
+        old = base.get((result['case'], result['size']))
+        if old is None:
+            continue
+        time_ratio = result['wall_time'] / old['wall_time'] if old['wall_time'] else 1.0
+        memory_ratio = None
+        if result['peak_memory'] and old['peak_memory']:
+            memory_ratio = result['peak_memory'] / old['peak_memory']
+        slower = time_ratio > 1 + threshold and max(result['wall_time'], old['wall_time']) >= min_time
+        regressed = slower or (memory_ratio is not None and memory_ratio > 1 + threshold)
+        rows.append({'case': result['case'], 'size': result['size'], 'time_ratio': time_ratio,
+                     'memory_ratio': memory_ratio, 'regressed': regressed})
+    return rows
+
+def print_comparison(rows, threshold):
+    print(f"\nCase            Size       Time x   Memory x   (regression threshold +{threshold * 100:.0f}%)")
+    print("-" * 70)
+    for row in rows:
+        memory = f"{row['memory_ratio']:8.2f}" if row['memory_ratio'] is not None else "       -"
+        flag = "  REGRESSION" if row['regressed'] else ""
+        print(f"{row['case']:15s} {row['size']:>9d}  {row['time_ratio']:7.2f}  {memory}{flag}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the CPU scheduling algorithms")
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES))
+    parser.add_argument('--sizes', nargs='+', type=int, default=list(DEFAULT_SIZES))
+    parser.add_argument('--budget', type=float, default=30.0,
+                        help="skip sizes of a case projected to run longer than this many seconds")
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc peak-memory pass")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="write results to this JSON file")
+    parser.add_argument('--compare', nargs='+', metavar='JSON',
+                        help="BASELINE [CURRENT]: compare a saved run (or a fresh one) against a baseline")
+    parser.add_argument('--threshold', type=float, default=0.10, help="relative slowdown flagged as a regression")
+    args = parser.parse_args(argv)
+    
+    if args.compare and len(args.compare) > 2:
+        parser.error("--compare takes a baseline and an optional current results file")
+    
+    if args.compare and len(args.compare) == 2:
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+    else:
+        current = run_suite(args.cases, args.sizes, args.budget, not args.no_memory, args.seed)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(current, f, indent=2)
+            print(f"\nResults saved to {args.output}")
+    
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        rows = compare(baseline, current, args.threshold)
+        print_comparison(rows, args.threshold)
+        if any(row['regressed'] for row in rows):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+"""
+Online (incremental) CPU scheduling
+
+OnlineScheduler accepts processes while the simulation is running: submit
+work at any time, advance one event with step(), or advance the clock with
+run_until(). Turnaround, waiting and response statistics are updated as
+each process completes, in O(1) per event: a running mean/variance
+(Welford) and P² percentile estimators, so nothing is ever recomputed from
+the full list of completed processes.
+"""
+
+import heapq
+from bisect import bisect_right, insort
+from collections import deque
+
+from task5_cpu_scheduling import GanttStore, Process, ProcessState
+
+class P2Quantile:
+    """Streaming estimate of one quantile with the P² algorithm
+    (Jain & Chlamtac, 1985): five markers, O(1) time and memory per value"""
+    
+    def __init__(self, p):
+        if not 0 < p < 1:
+            raise ValueError("quantile must be between 0 and 1")
+        self.p = p
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+    
+    def add(self, x):
+        q = self.heights
+        if len(q) < 5:
+            insort(q, x)
+            return
+        
+        # Find the cell that x falls into, stretching the extremes if needed
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = bisect_right(q, x) - 1
+        
+        n = self.positions
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+        
+        # Nudge the three middle markers towards their desired positions
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                parabolic = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if q[i - 1] < parabolic < q[i + 1]:
+                    q[i] = parabolic
+                else:
+                    q[i] += d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                n[i] += d
+    
+    def value(self):
+        q = self.heights
+        if not q:
+            return 0.0
+        if len(q) < 5:
+            return q[min(len(q) - 1, int(round(self.p * (len(q) - 1))))]
+        return q[2]
+
+class StreamingStats:
+    """Count, mean, standard deviation, min, max and percentiles of a stream"""
+    
+    def __init__(self, percentiles=(0.5, 0.9, 0.99)):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = None
+        self.max = None
+        self.quantiles = {p: P2Quantile(p) for p in percentiles}
+    
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        self.min = x if self.min is None else min(self.min, x)
+        self.max = x if self.max is None else max(self.max, x)
+        for estimator in self.quantiles.values():
+            estimator.add(x)
+    
+    @property
+    def stdev(self):
+        return (self._m2 / (self.count - 1)) ** 0.5 if self.count > 1 else 0.0
+    
+    def summary(self):
+        result = {'count': self.count, 'mean': self.mean, 'stdev': self.stdev,
+                  'min': self.min, 'max': self.max}
+        for p, estimator in self.quantiles.items():
+            result[f"p{p * 100:g}"] = estimator.value()
+        return result
+
+class OnlineScheduler:
+    """Event-driven scheduler that runs while processes are being submitted
+    
+    ``algorithm`` is 'fcfs', 'sjf', 'priority' (all non-preemptive) or 'rr'.
+    Processes may be submitted with any arrival time; ones that arrive in
+    the past are admitted at the current time but keep their arrival time
+    for the statistics.
+    """
+    
+    def __init__(self, algorithm='fcfs', time_quantum=2, percentiles=(0.5, 0.9, 0.99)):
+        if algorithm not in ('fcfs', 'sjf', 'priority', 'rr'):
+            raise ValueError(f"Unknown algorithm '{algorithm}', expected fcfs, sjf, priority or rr")
+        self.algorithm = algorithm
+        self.time_quantum = time_quantum
+        self.current_time = 0
+        self.gantt_chart = GanttStore()
+        self.completed_count = 0
+        self.turnaround = StreamingStats(percentiles)
+        self.waiting = StreamingStats(percentiles)
+        self.response = StreamingStats(percentiles)
+        
+        self._pending = []    # heap of (arrival_time, seq, process) not yet admitted
+        self._seq = 0
+        self._ready = [] if algorithm in ('sjf', 'priority') else deque()
+        self._running = None  # process holding the CPU
+        self._slice_end = None
+    
+    def submit(self, process: Process):
+        process.remaining_time = process.burst_time
+        process.start_time = -1
+        process.completion_time = -1
+        process.state = ProcessState.WAITING
+        heapq.heappush(self._pending, (process.arrival_time, self._seq, process))
+        self._seq += 1
+    
+    def pending(self):
+        """Processes submitted but not yet finished"""
+        return len(self._pending) + len(self._ready) + (self._running is not None)
+    
+    def next_event_time(self):
+        """Time of the next arrival or slice end, or None when there is nothing to do"""
+        times = []
+        if self._pending:
+            times.append(max(self._pending[0][0], self.current_time))
+        if self._running is not None:
+            times.append(self._slice_end)
+        return min(times) if times else None
+    
+    def step(self):
+        """Process every event at the next event time; returns the processes
+        that completed (an empty list if nothing happened)"""
+        event_time = self.next_event_time()
+        if event_time is None:
+            return []
+        self.current_time = event_time
+        
+        # Arrivals first: in RR they queue ahead of a process whose quantum just ended
+        while self._pending and self._pending[0][0] <= event_time:
+            _, seq, process = heapq.heappop(self._pending)
+            self._enqueue(process, seq)
+        
+        completed = []
+        if self._running is not None and self._slice_end == event_time:
+            process = self._running
+            self._running = None
+            if process.remaining_time == 0:
+                process.completion_time = event_time
+                process.state = ProcessState.COMPLETED
+                self._record(process)
+                completed.append(process)
+            else:
+                process.state = ProcessState.READY
+                self._enqueue(process, self._seq)
+                self._seq += 1
+        
+        if self._running is None and self._ready:
+            self._dispatch()
+        return completed
+    
+    def run_until(self, t):
+        """Process every event before time t, then move the clock to t
+        
+        Events at exactly t are left for the next call, so processes
+        submitted for time t compete with them as in the batch scheduler.
+        """
+        completed = []
+        while True:
+            event_time = self.next_event_time()
+            if event_time is None or event_time >= t:
+                break
+            completed.extend(self.step())
+        self.current_time = max(self.current_time, t)
+        return completed
+    
+    def run(self):
+        """Run until every submitted process has completed"""
+        completed = []
+        while self.next_event_time() is not None:
+            completed.extend(self.step())
+        return completed
+    
+    def replay(self, rows):
+        """Feed (pid, arrival, burst, priority) rows in arrival order,
+        simulating up to each arrival before submitting it; returns every
+        process that completed, in completion order"""
+        completed = []
+        for pid, arrival, burst, priority in rows:
+            completed.extend(self.run_until(arrival))
+            self.submit(Process(pid, arrival, burst, priority))
+        return completed + self.run()
+    
+    def stats(self):
+        """Current streaming statistics"""
+        makespan = self.current_time
+        return {
+            'completed': self.completed_count,
+            'in_flight': self.pending(),
+            'throughput': self.completed_count / makespan if makespan else 0.0,
+            'turnaround': self.turnaround.summary(),
+            'waiting': self.waiting.summary(),
+            'response': self.response.summary(),
+        }
+    
+    def print_stats(self):
+        stats = self.stats()
+        print(f"\nOnline {self.algorithm.upper()} at t={self.current_time}: "
+              f"{stats['completed']} completed, {stats['in_flight']} in flight")
+        for name in ('turnaround', 'waiting', 'response'):
+            summary = stats[name]
+            percentiles = "  ".join(f"{key}={value:.2f}" for key, value in summary.items() if key.startswith('p'))
+            print(f"{name.capitalize():11s} mean={summary['mean']:.2f}  stdev={summary['stdev']:.2f}  {percentiles}")
+    
+    def _enqueue(self, process, seq):
+        if self.algorithm == 'sjf':
+            heapq.heappush(self._ready, (process.burst_time, seq, process))
+        elif self.algorithm == 'priority':
+            heapq.heappush(self._ready, (process.priority, seq, process))
+        else:
+            self._ready.append(process)
+    
+    def _dispatch(self):
+        if self.algorithm in ('sjf', 'priority'):
+            process = heapq.heappop(self._ready)[2]
+        else:
+            process = self._ready.popleft()
+        
+        if process.start_time == -1:
+            process.start_time = self.current_time
+        process.state = ProcessState.RUNNING
+        run_time = process.remaining_time
+        if self.algorithm == 'rr':
+            run_time = min(self.time_quantum, run_time)
+        process.remaining_time -= run_time
+        self._running = process
+        self._slice_end = self.current_time + run_time
+        self.gantt_chart.append((process.pid, self.current_time, self._slice_end))
+    
+    def _record(self, process):
+        self.completed_count += 1
+        self.turnaround.add(process.turnaround_time)
+        self.waiting.add(process.waiting_time)
+        self.response.add(process.start_time - process.arrival_time)
+
+if __name__ == "__main__":
+    import random
+    
+    scheduler = OnlineScheduler('rr', time_quantum=2)
+    arrival = 0
+    for pid in range(1, 10001):
+        arrival += random.randint(2, 10)
+        scheduler.run_until(arrival)
+        scheduler.submit(Process(pid, arrival, random.randint(1, 10), random.randint(1, 5)))
+        if pid % 2500 == 0:
+            scheduler.print_stats()
+    scheduler.run()
+    scheduler.print_stats()
+    
+    # The same kind of trace fed through replay()
+    rows, arrival = [], 0
+    for pid in range(1, 2001):
+        arrival += random.randint(0, 6)
+        rows.append((pid, arrival, random.randint(1, 10), random.randint(1, 5)))
+    replayed = OnlineScheduler('rr', time_quantum=2)
+    completed = replayed.replay(rows)
+    print(f"\nreplay(): {len(completed)} of {len(rows)} processes completed")
+    replayed.print_stats()
@@ -0,0 +1,119 @@
+"""
+Round Robin time-quantum sweep
+
+Runs CPUScheduler.round_robin() for a range of quanta (and optionally
+several workloads) in parallel worker processes and reports average
+waiting, turnaround and response time plus context switches per quantum.
+Each workload is placed in shared memory once per sweep, and every result
+is cached on disk under (workload hash, quantum), so repeating a sweep on
+an unchanged trace returns immediately.
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from task5_cpu_scheduling import (ProcessTable, SHARED_COLUMNS,
+                                  _run_shared_workload, _share_workload)
+
+DEFAULT_CACHE_DIR = '.quantum_sweep_cache'
+METRICS = ('avg_waiting', 'avg_turnaround', 'avg_response', 'context_switches')
+
+def workload_hash(table):
+    """SHA-256 over the input columns of a ProcessTable"""
+    digest = hashlib.sha256()
+    for name in SHARED_COLUMNS:
+        digest.update(getattr(table, name).tobytes())
+    return digest.hexdigest()
+
+def _cache_path(cache_dir, digest, quantum):
+    return os.path.join(cache_dir, f"{digest[:32]}_q{quantum}.json")
+
+def _load_cached(cache_dir, digest, quantum):
+    path = _cache_path(cache_dir, digest, quantum)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def _store_cached(cache_dir, digest, quantum, stats):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _cache_path(cache_dir, digest, quantum)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(stats, f)
+    os.replace(path + '.tmp', path)  # atomic, so a killed sweep never leaves half a file
+
+def sweep_quanta(workloads, quanta=range(1, 11), max_workers=None, cache_dir=DEFAULT_CACHE_DIR):
+    """Evaluate Round Robin for every (workload, quantum) pair
+    
+    ``workloads`` is a ProcessTable, a list of Process objects, or a dict
+    mapping names to either. Pass ``cache_dir=None`` to disable caching.
+    Returns a list of rows: {'workload', 'quantum', 'cached', *METRICS}.
+    """
+    if not isinstance(workloads, dict):
+        workloads = {'workload': workloads}
+    
+    rows = []
+    pending = []
+    tables = {}
+    for name, workload in workloads.items():
+        table = workload if isinstance(workload, ProcessTable) else ProcessTable.from_processes(workload)
+        digest = workload_hash(table)
+        tables[name] = (table, digest)
+        for quantum in quanta:
+            stats = _load_cached(cache_dir, digest, quantum) if cache_dir else None
+            if stats is None:
+                pending.append((name, quantum))
+            else:
+                rows.append(dict(workload=name, quantum=quantum, cached=True, **stats))
+    
+    if pending:
+        blocks = {name: _share_workload(tables[name][0]) for name in {name for name, _ in pending}}
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                futures = [(name, quantum, pool.submit(_run_shared_workload, blocks[name].name,
+                                                       len(tables[name][0]), 'rr', quantum))
+                           for name, quantum in pending]
+                for name, quantum, future in futures:
+                    result = future.result()
+                    stats = {metric: result.get(metric, 0) for metric in METRICS}
+                    if cache_dir:
+                        _store_cached(cache_dir, tables[name][1], quantum, stats)
+                    rows.append(dict(workload=name, quantum=quantum, cached=False, **stats))
+        finally:
+            for block in blocks.values():
+                block.close()
+                block.unlink()
+    
+    rows.sort(key=lambda row: (row['workload'], row['quantum']))
+    return rows
+
+def print_sweep_table(rows):
+    """Print sweep results as a table"""
+    print("\nRound Robin Quantum Sweep:")
+    print("Workload     | Quantum | Avg Waiting | Avg Turnaround | Avg Response | Switches | Cached")
+    print("-" * 90)
+    for row in rows:
+        print(f"{row['workload'][:12]:12s} | {row['quantum']:7d} | {row['avg_waiting']:11.2f} | "
+              f"{row['avg_turnaround']:14.2f} | {row['avg_response']:12.2f} | {row['context_switches']:8d} | "
+              f"{'yes' if row['cached'] else 'no'}")
+
+def print_sweep_chart(rows, metric='avg_waiting', width=50):
+    """Print a horizontal bar chart of one metric against the quantum"""
+    if not rows:
+        return
+    peak = max(row[metric] for row in rows) or 1
+    print(f"\n{metric} by quantum:")
+    for row in rows:
+        bar = "█" * round(row[metric] / peak * width)
+        print(f"{row['workload'][:12]:12s} q={row['quantum']:<4d} {bar} {row[metric]:.2f}")
+
+if __name__ == "__main__":
+    from task5_cpu_scheduling import CPUScheduler
+    
+    scheduler = CPUScheduler()
+    scheduler.generate_test_processes(200)
+    results = sweep_quanta(scheduler.processes, quanta=range(1, 11))
+    print_sweep_table(results)
+    print_sweep_chart(results)
@@ -1,9 +1,28 @@
+import heapq
 import random
+import sys
+from array import array
+from bisect import bisect_right
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from itertools import islice
 from dataclasses import dataclass
 from typing import List, Dict
 from enum import Enum
 
+try:
+    import numpy as np
+except ImportError:  # only needed for the bulk (array) mode
+    np = None
+
+# Load weight of a priority-1 process in the CFS policy (same value as Linux nice 0)
+NICE_0_WEIGHT = 1024
+
+# Stride scheduling: a process's stride is STRIDE1 / tickets
+STRIDE1 = 1 << 20
+
 class ProcessState(Enum):
     READY = "READY"
     RUNNING = "RUNNING"
@@ -36,12 +55,321 @@ class Process:
             return self.turnaround_time - self.burst_time
         return 0
 
+# ProcessState <-> one-byte code used by ProcessTable.state
+STATE_BY_CODE = list(ProcessState)
+CODE_BY_STATE = {state: code for code, state in enumerate(STATE_BY_CODE)}
+
+class ProcessTable:
+    """Struct-of-arrays process storage for large workloads
+    
+    Every field lives in its own typed ``array`` column, indexed by
+    submission order, so a process costs ~41 bytes instead of a full
+    dataclass instance. Behaves like a list of processes: ``append()``,
+    ``len()``, indexing and iteration work, with items returned as
+    ProcessView objects. CPUScheduler.fcfs/sjf/priority_scheduling/
+    round_robin read and write the columns directly.
+    """
+    
+    def __init__(self):
+        self.pid = array('i')
+        self.arrival = array('q')
+        self.burst = array('i')
+        self.priority = array('i')
+        self.remaining = array('i')
+        self.start = array('q')
+        self.completion = array('q')
+        self.state = array('b')
+    
+    @classmethod
+    def from_processes(cls, processes):
+        table = cls()
+        for process in processes:
+            table.append(process)
+        return table
+    
+    def add(self, pid, arrival_time, burst_time, priority=1):
+        """Append one process from raw field values"""
+        self.pid.append(pid)
+        self.arrival.append(arrival_time)
+        self.burst.append(burst_time)
+        self.priority.append(priority)
+        self.remaining.append(burst_time)
+        self.start.append(-1)
+        self.completion.append(-1)
+        self.state.append(CODE_BY_STATE[ProcessState.READY])
+    
+    def append(self, process: Process):
+        self.add(process.pid, process.arrival_time, process.burst_time, process.priority)
+    
+    def extend_rows(self, rows, chunk_size=65536):
+        """Append (pid, arrival, burst, priority) tuples from any iterable
+        
+        Rows are consumed a chunk at a time and added column by column, so
+        a streaming source is never materialized as a whole.
+        """
+        rows = iter(rows)
+        ready = CODE_BY_STATE[ProcessState.READY]
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            pids, arrivals, bursts, priorities = zip(*chunk)
+            self.pid.extend(pids)
+            self.arrival.extend(arrivals)
+            self.burst.extend(bursts)
+            self.priority.extend(priorities)
+            self.remaining.extend(bursts)
+            self.start.extend([-1] * len(chunk))
+            self.completion.extend([-1] * len(chunk))
+            self.state.frombytes(bytes([ready]) * len(chunk))
+    
+    def reset(self):
+        """Clear results so the workload can be scheduled again"""
+        count = len(self.pid)
+        self.remaining[:] = array(self.remaining.typecode, self.burst)
+        self.start[:] = array('q', [-1]) * count
+        self.completion[:] = array('q', [-1]) * count
+        self.state[:] = array('b', bytes([CODE_BY_STATE[ProcessState.READY]]) * count)
+    
+    def clear(self):
+        for column in self.columns():
+            del column[:]
+    
+    def columns(self):
+        return (self.pid, self.arrival, self.burst, self.priority,
+                self.remaining, self.start, self.completion, self.state)
+    
+    def nbytes(self):
+        """Memory held by the column buffers"""
+        return sum(column.itemsize * len(column) for column in self.columns())
+    
+    def __len__(self):
+        return len(self.pid)
+    
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.pid)
+        if not 0 <= index < len(self.pid):
+            raise IndexError("process index out of range")
+        return ProcessView(self, index)
+    
+    def __iter__(self):
+        for index in range(len(self.pid)):
+            yield ProcessView(self, index)
+
+class ProcessView:
+    """Per-process access to one row of a ProcessTable, with the same
+    attribute names as Process"""
+    __slots__ = ('_table', '_index')
+    
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+    
+    @property
+    def pid(self):
+        return self._table.pid[self._index]
+    
+    @property
+    def arrival_time(self):
+        return self._table.arrival[self._index]
+    
+    @property
+    def burst_time(self):
+        return self._table.burst[self._index]
+    
+    @property
+    def priority(self):
+        return self._table.priority[self._index]
+    
+    @property
+    def remaining_time(self):
+        return self._table.remaining[self._index]
+    
+    @remaining_time.setter
+    def remaining_time(self, value):
+        self._table.remaining[self._index] = value
+    
+    @property
+    def start_time(self):
+        return self._table.start[self._index]
+    
+    @start_time.setter
+    def start_time(self, value):
+        self._table.start[self._index] = value
+    
+    @property
+    def completion_time(self):
+        return self._table.completion[self._index]
+    
+    @completion_time.setter
+    def completion_time(self, value):
+        self._table.completion[self._index] = value
+    
+    @property
+    def state(self):
+        return STATE_BY_CODE[self._table.state[self._index]]
+    
+    @state.setter
+    def state(self, value):
+        self._table.state[self._index] = CODE_BY_STATE[value]
+    
+    @property
+    def turnaround_time(self):
+        if self.completion_time != -1:
+            return self.completion_time - self.arrival_time
+        return 0
+    
+    @property
+    def waiting_time(self):
+        if self.completion_time != -1:
+            return self.turnaround_time - self.burst_time
+        return 0
+    
+    def __repr__(self):
+        return (f"ProcessView(pid={self.pid}, arrival_time={self.arrival_time}, "
+                f"burst_time={self.burst_time}, priority={self.priority})")
+
+class ProcessSequence:
+    """Read-only sequence of ProcessTable rows in a given order, used for
+    ``completed_processes`` so table runs never build per-process objects"""
+    
+    def __init__(self, table, indices):
+        self._table = table
+        self._indices = indices
+    
+    def __len__(self):
+        return len(self._indices)
+    
+    def __getitem__(self, position):
+        return ProcessView(self._table, self._indices[position])
+    
+    def __iter__(self):
+        for index in self._indices:
+            yield ProcessView(self._table, index)
+
+class GanttStore:
+    """Run-length compressed, columnar Gantt chart for one CPU
+    
+    Slices are kept in parallel pid/start/end arrays; appending a slice that
+    continues the previous one for the same pid extends it instead of adding
+    a row. Iteration and indexing yield (pid, start, end) tuples, so the
+    store can stand in for the old list of tuples. Because slices on one CPU
+    never overlap, "what ran at time t" is a bisect over the start column,
+    and a pid-sorted index (built on first use) answers per-pid range
+    queries in O(log n + k). ``dispatches`` counts every appended slice,
+    merged or not, i.e. how many times a process was put on the CPU.
+    """
+    
+    def __init__(self):
+        self.dispatches = 0
+        self.pid = array('i')
+        self.start = array('q')
+        self.end = array('q')
+        self._by_pid = None  # slice positions sorted by (pid, start), built lazily
+    
+    def append(self, entry):
+        pid, start, end = entry
+        self.dispatches += 1
+        if self.pid and self.pid[-1] == pid and self.end[-1] == start:
+            self.end[-1] = end
+            return
+        self.pid.append(pid)
+        self.start.append(start)
+        self.end.append(end)
+        self._by_pid = None
+    
+    def __len__(self):
+        return len(self.pid)
+    
+    def __bool__(self):
+        return len(self.pid) > 0
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(zip(self.pid[index], self.start[index], self.end[index]))
+        return self.pid[index], self.start[index], self.end[index]
+    
+    def __iter__(self):
+        return zip(self.pid, self.start, self.end)
+    
+    def running_at(self, t):
+        """pid running at time t, or None if the CPU was idle"""
+        k = bisect_right(self.start, t) - 1
+        if k >= 0 and t < self.end[k]:
+            return self.pid[k]
+        return None
+    
+    def slices_of(self, pid, a=float('-inf'), b=float('inf')):
+        """All (pid, start, end) slices of ``pid`` that overlap [a, b)"""
+        if self._by_pid is None:
+            # Slices are already in start order, so a stable sort on pid gives (pid, start) order
+            self._by_pid = array('q', sorted(range(len(self.pid)), key=self.pid.__getitem__))
+        by_pid = self._by_pid
+        # First slice of this pid that ends after a; later slices start in order
+        k = bisect_right(by_pid, (pid, a), key=lambda i: (self.pid[i], self.end[i]))
+        result = []
+        while k < len(by_pid) and self.pid[by_pid[k]] == pid and self.start[by_pid[k]] < b:
+            result.append(self[by_pid[k]])
+            k += 1
+        return result
+    
+    def context_switches(self):
+        """Number of adjacent slices that belong to different processes"""
+        pids = self.pid
+        return sum(1 for k in range(1, len(pids)) if pids[k] != pids[k - 1])
+    
+    def render(self, out=None, sep=" ", batch=4096):
+        """Write "P<pid>[<start>-<end>]" for every slice in linear time
+        
+        Text is written in batches rather than built by repeated string
+        concatenation, which is quadratic on long schedules.
+        """
+        out = sys.stdout if out is None else out
+        parts = []
+        for pid, start, end in self:
+            parts.append(f"P{pid}[{start}-{end}]{sep}")
+            if len(parts) >= batch:
+                out.write("".join(parts))
+                parts.clear()
+        out.write("".join(parts))
+
+class _FenwickTree:
+    """Binary indexed tree over ticket counts: update and weighted lookup
+    in O(log n)"""
+    
+    def __init__(self, size):
+        self.size = size
+        self.tree = [0] * (size + 1)
+        self.top_bit = 1 << size.bit_length() if size else 0
+    
+    def add(self, index, delta):
+        index += 1
+        while index <= self.size:
+            self.tree[index] += delta
+            index += index & -index
+    
+    def find(self, ticket):
+        """Smallest index whose prefix sum exceeds ``ticket``"""
+        pos = 0
+        bit = self.top_bit
+        while bit:
+            nxt = pos + bit
+            if nxt <= self.size and self.tree[nxt] <= ticket:
+                pos = nxt
+                ticket -= self.tree[nxt]
+            bit >>= 1
+        return pos
+
 class CPUScheduler:
     def __init__(self):
         self.processes = []
         self.completed_processes = []
         self.current_time = 0
-        self.gantt_chart = []
+        self.gantt_chart = GanttStore()
+        self.core_gantt = []   # one Gantt chart per core after smp_schedule()
+        self.smp_stats = {}
+        self.share_report = []  # per-process CPU share after lottery()/stride()
     
     def add_process(self, process: Process):
         self.processes.append(process)
@@ -55,175 +383,957 @@ class CPUScheduler:
             priority = random.randint(1, 5)
             self.processes.append(Process(i+1, arrival, burst, priority))
     
-    def fcfs(self):
+    def reset_processes(self):
+        """Clear results from a previous run without copying the workload"""
+        if isinstance(self.processes, ProcessTable):
+            self.processes.reset()
+            return
+        for process in self.processes:
+            process.remaining_time = process.burst_time
+            process.start_time = -1
+            process.completion_time = -1
+            process.state = ProcessState.READY
+    
+    def fcfs(self, verbose=True):
         """First Come First Serve Scheduling"""
-        print("\nFirst Come First Serve (FCFS) Scheduling:")
-        print("-" * 50)
+        if verbose:
+            print("\nFirst Come First Serve (FCFS) Scheduling:")
+            print("-" * 50)
         
-        # Sort by arrival time
-        ready_queue = sorted([p for p in self.processes], key=lambda x: x.arrival_time)
+        pid, arrival, burst, _ = self._columns()
+        _, start, completion = self._result_columns(burst)
         self.current_time = 0
-        self.completed_processes = []
-        self.gantt_chart = []
+        self.gantt_chart = GanttStore()
         
-        for process in ready_queue:
-            if self.current_time < process.arrival_time:
-                self.current_time = process.arrival_time
+        # Sort by arrival time
+        ready_queue = sorted(range(len(arrival)), key=arrival.__getitem__)
+        
+        for i in ready_queue:
+            if self.current_time < arrival[i]:
+                self.current_time = arrival[i]
             
-            process.start_time = self.current_time
-            process.state = ProcessState.RUNNING
+            start[i] = self.current_time
             
             # Execute process
-            self.gantt_chart.append((process.pid, self.current_time, self.current_time + process.burst_time))
-            self.current_time += process.burst_time
+            self.gantt_chart.append((pid[i], self.current_time, self.current_time + burst[i]))
+            self.current_time += burst[i]
             
-            process.completion_time = self.current_time
+            completion[i] = self.current_time
+        
+        self._finish_run(start, completion, ready_queue)
+        
+        if verbose:
+            self.print_schedule()
+    
+    def fcfs_bulk(self, arrival, burst, priority=None, verbose=True):
+        """Vectorized FCFS over whole arrays (requires NumPy)
+        
+        Works on array-likes of arrival and burst times instead of Process
+        objects. With processes sorted by arrival, completion time is
+        C[i] = S[i] + max_{j<=i}(A[j] - S[j-1]), where S is the cumulative
+        burst sum, so the whole schedule is one cumsum and one running max.
+        Returns a dict of per-process arrays (in input order) and averages;
+        ``order`` is the arrival-sorted index, or None if the input was sorted.
+        """
+        if np is None:
+            raise RuntimeError("fcfs_bulk requires NumPy (pip install numpy)")
+        
+        arrival = np.asarray(arrival, dtype=np.int64)
+        burst = np.asarray(burst, dtype=np.int64)
+        if arrival.shape != burst.shape:
+            raise ValueError("arrival and burst must have the same length")
+        
+        # Traces are usually already in arrival order; skip the sort and gathers then.
+        # Otherwise a stable sort keeps submission order for equal arrivals, like fcfs().
+        if np.all(arrival[1:] >= arrival[:-1]):
+            order = None
+            finished_work = np.cumsum(burst)
+            completion = finished_work + np.maximum.accumulate(arrival - (finished_work - burst))
+        else:
+            order = np.argsort(arrival, kind='stable')
+            sorted_burst = burst[order]
+            finished_work = np.cumsum(sorted_burst)
+            completion = np.empty_like(finished_work)
+            completion[order] = finished_work + np.maximum.accumulate(arrival[order] - (finished_work - sorted_burst))
+        
+        start = completion - burst
+        turnaround = completion - arrival
+        waiting = turnaround - burst
+        
+        num_processes = len(arrival)
+        result = {
+            'order': order,
+            'start': start,
+            'completion': completion,
+            'turnaround': turnaround,
+            'waiting': waiting,
+            'priority': None if priority is None else np.asarray(priority),
+            'avg_turnaround': float(turnaround.mean()) if num_processes else 0.0,
+            'avg_waiting': float(waiting.mean()) if num_processes else 0.0,
+            'makespan': int(completion.max() - arrival.min()) if num_processes else 0,
+        }
+        
+        if verbose:
+            print(f"\nFirst Come First Serve (FCFS) Bulk Scheduling ({num_processes} processes):")
+            print("-" * 50)
+            print(f"Makespan: {result['makespan']}")
+            print(f"Average Turnaround Time: {result['avg_turnaround']:.2f}")
+            print(f"Average Waiting Time: {result['avg_waiting']:.2f}")
+        
+        return result
+    
+    def _columns(self):
+        """(pid, arrival, burst, priority) columns of the current workload
+        
+        A ProcessTable already stores its fields as columns; a list of
+        Process objects is unpacked once so the engines below only index
+        flat sequences.
+        """
+        if isinstance(self.processes, ProcessTable):
+            table = self.processes
+            return table.pid, table.arrival, table.burst, table.priority
+        return ([p.pid for p in self.processes],
+                [p.arrival_time for p in self.processes],
+                [p.burst_time for p in self.processes],
+                [p.priority for p in self.processes])
+    
+    def _result_columns(self, burst):
+        """(remaining, start, completion) columns for an engine to write into
+        
+        remaining is reset to the burst time; start keeps its current values
+        so Round Robin can tell first dispatch from re-dispatch.
+        """
+        if isinstance(self.processes, ProcessTable):
+            table = self.processes
+            table.remaining[:] = array(table.remaining.typecode, burst)
+            return table.remaining, table.start, table.completion
+        return (list(burst),
+                [p.start_time for p in self.processes],
+                [-1] * len(self.processes))
+    
+    def _finish_run(self, start, completion, finish_order):
+        """Publish engine results and fill completed_processes in finish order"""
+        if isinstance(self.processes, ProcessTable):
+            table = self.processes
+            count = len(table)
+            table.remaining[:] = array(table.remaining.typecode, bytes(table.remaining.itemsize * count))
+            table.state[:] = array('b', bytes([CODE_BY_STATE[ProcessState.COMPLETED]]) * count)
+            self.completed_processes = ProcessSequence(table, array('q', finish_order))
+            return
+        
+        self.completed_processes = []
+        for i in finish_order:
+            process = self.processes[i]
+            process.start_time = start[i]
+            process.completion_time = completion[i]
+            process.remaining_time = 0
             process.state = ProcessState.COMPLETED
             self.completed_processes.append(process)
+    
+    def _run_non_preemptive(self, key):
+        """Event-driven engine shared by SJF and non-preemptive priority.
+
+        ``key`` names the column to order by ('burst_time' or 'priority').
+        Arrived processes wait in a heap ordered by (key, submission index), so
+        ties are broken exactly as ``min()`` over the process list would. When
+        nothing is ready the clock jumps straight to the next arrival.
+        """
+        pid, arrival, burst, priority = self._columns()
+        keys = burst if key == 'burst_time' else priority
+        _, start, completion = self._result_columns(burst)
+        self.current_time = 0
+        self.gantt_chart = GanttStore()
+        
+        # Submission indices sorted by arrival (stable, so equal arrivals keep list order)
+        order = sorted(range(len(arrival)), key=arrival.__getitem__)
+        finish_order = []
+        ready = []
+        cursor = 0
+        total = len(order)
+        
+        while cursor < total or ready:
+            # Move every process that has arrived into the ready heap
+            while cursor < total and arrival[order[cursor]] <= self.current_time:
+                i = order[cursor]
+                heapq.heappush(ready, (keys[i], i))
+                cursor += 1
+            
+            if not ready:
+                # CPU idle, jump to the next arrival
+                self.current_time = arrival[order[cursor]]
+                continue
+            
+            i = heapq.heappop(ready)[1]
+            start[i] = self.current_time
+            
+            # Execute process
+            self.gantt_chart.append((pid[i], self.current_time, self.current_time + burst[i]))
+            self.current_time += burst[i]
+            
+            completion[i] = self.current_time
+            finish_order.append(i)
         
-        self.print_schedule()
+        self._finish_run(start, completion, finish_order)
     
-    def sjf(self):
+    def sjf(self, verbose=True):
         """Shortest Job First Scheduling (Non-preemptive)"""
-        print("\nShortest Job First (SJF) Scheduling:")
-        print("-" * 50)
+        if verbose:
+            print("\nShortest Job First (SJF) Scheduling:")
+            print("-" * 50)
         
+        # Select process with shortest burst time
+        self._run_non_preemptive(key='burst_time')
+        
+        if verbose:
+            self.print_schedule()
+    
+    def priority_scheduling(self, verbose=True):
+        """Priority Scheduling (Non-preemptive)"""
+        if verbose:
+            print("\nPriority Scheduling (Non-preemptive):")
+            print("-" * 50)
+        
+        # Select process with highest priority (lower number = higher priority)
+        self._run_non_preemptive(key='priority')
+        
+        if verbose:
+            self.print_schedule()
+    
+    def round_robin(self, time_quantum=2, verbose=True):
+        """Round Robin Scheduling"""
+        if verbose:
+            print(f"\nRound Robin Scheduling (Time Quantum: {time_quantum}):")
+            print("-" * 50)
+        
+        pid, arrival, burst, _ = self._columns()
+        # Reset remaining times
+        remaining, start, completion = self._result_columns(burst)
         self.current_time = 0
-        self.completed_processes = []
-        self.gantt_chart = []
-        remaining_processes = self.processes.copy()
+        self.gantt_chart = GanttStore()
+        ready_queue = deque()
+        finish_order = []
+        
+        # Cursor into the arrival-sorted submission indices
+        order = sorted(range(len(arrival)), key=arrival.__getitem__)
+        arrivals = [arrival[i] for i in order]
+        arrivals.append(float('inf'))  # sentinel, never admitted
+        cursor = 0
+        total = len(order)
+        
+        def admit_arrivals():
+            # Arrivals that land in the same slice join the queue in submission order
+            nonlocal cursor
+            first = cursor
+            while arrivals[cursor] <= self.current_time:
+                cursor += 1
+            if cursor - first == 1:
+                ready_queue.append(order[first])
+            elif cursor > first:
+                ready_queue.extend(sorted(order[first:cursor]))
         
-        while remaining_processes:
-            # Get processes that have arrived
-            available_processes = [p for p in remaining_processes if p.arrival_time <= self.current_time]
+        while cursor < total or ready_queue:
+            # Add processes that have arrived to ready queue
+            if arrivals[cursor] <= self.current_time:
+                admit_arrivals()
             
-            if not available_processes:
-                # No processes available, advance time
-                self.current_time += 1
+            if not ready_queue:
+                # CPU idle, jump to the next arrival
+                self.current_time = arrivals[cursor]
                 continue
             
-            # Select process with shortest burst time
-            next_process = min(available_processes, key=lambda x: x.burst_time)
-            remaining_processes.remove(next_process)
+            # Get next process from ready queue
+            i = ready_queue.popleft()
             
-            next_process.start_time = self.current_time
-            next_process.state = ProcessState.RUNNING
+            if start[i] == -1:
+                start[i] = self.current_time
             
-            # Execute process
-            self.gantt_chart.append((next_process.pid, self.current_time, self.current_time + next_process.burst_time))
-            self.current_time += next_process.burst_time
+            # Execute for time quantum or remaining time
+            execution_time = min(time_quantum, remaining[i])
+            start_time = self.current_time
+            self.current_time += execution_time
+            remaining[i] -= execution_time
+            
+            self.gantt_chart.append((pid[i], start_time, self.current_time))
+            
+            # Add new arrivals during execution
+            if arrivals[cursor] <= self.current_time:
+                admit_arrivals()
+            
+            if remaining[i] > 0:
+                # Process not finished, add back to ready queue
+                ready_queue.append(i)
+            else:
+                # Process completed
+                completion[i] = self.current_time
+                finish_order.append(i)
+        
+        self._finish_run(start, completion, finish_order)
+        
+        if verbose:
+            self.print_schedule()
+    
+    def _run_preemptive(self, key):
+        """Event-driven engine shared by SRTF and preemptive priority.
+
+        The scheduler only re-decides at arrivals and completions: the running
+        process keeps the CPU until it finishes or the next arrival, and is
+        preempted only when a ready process has a strictly smaller key.
+        """
+        self.current_time = 0
+        self.completed_processes = []
+        self.gantt_chart = GanttStore()
+        
+        for process in self.processes:
+            process.remaining_time = process.burst_time
+            process.start_time = -1
+        
+        order = sorted(range(len(self.processes)), key=lambda i: self.processes[i].arrival_time)
+        arrivals = [self.processes[i].arrival_time for i in order]
+        arrivals.append(float('inf'))  # sentinel, never admitted
+        cursor = 0
+        total = len(order)
+        ready = []
+        current = None  # submission index of the process holding the CPU
+        
+        while cursor < total or ready or current is not None:
+            # Move every process that has arrived into the ready heap
+            while arrivals[cursor] <= self.current_time:
+                i = order[cursor]
+                heapq.heappush(ready, (key(self.processes[i]), i))
+                cursor += 1
+            
+            if current is None:
+                if not ready:
+                    # CPU idle, jump to the next arrival
+                    self.current_time = arrivals[cursor]
+                    continue
+                current = heapq.heappop(ready)[1]
+            elif ready and ready[0][0] < key(self.processes[current]):
+                # Preempt: a ready process now has a strictly better key
+                current = heapq.heappushpop(ready, (key(self.processes[current]), current))[1]
+            
+            process = self.processes[current]
+            if process.start_time == -1:
+                process.start_time = self.current_time
+            process.state = ProcessState.RUNNING
             
-            next_process.completion_time = self.current_time
-            next_process.state = ProcessState.COMPLETED
-            self.completed_processes.append(next_process)
+            # Run until the process finishes or the next arrival, whichever is first
+            start_time = self.current_time
+            self.current_time = min(start_time + process.remaining_time, arrivals[cursor])
+            process.remaining_time -= self.current_time - start_time
+            
+            self.gantt_chart.append((process.pid, start_time, self.current_time))
+            
+            if process.remaining_time == 0:
+                process.completion_time = self.current_time
+                process.state = ProcessState.COMPLETED
+                self.completed_processes.append(process)
+                current = None
+    
+    def srtf(self, verbose=True):
+        """Shortest Remaining Time First Scheduling (Preemptive SJF)"""
+        if verbose:
+            print("\nShortest Remaining Time First (SRTF) Scheduling:")
+            print("-" * 50)
         
-        self.print_schedule()
+        # Select process with shortest remaining time
+        self._run_preemptive(key=lambda x: x.remaining_time)
+        
+        if verbose:
+            self.print_schedule()
     
-    def priority_scheduling(self):
-        """Priority Scheduling (Non-preemptive)"""
-        print("\nPriority Scheduling (Non-preemptive):")
-        print("-" * 50)
+    def preemptive_priority_scheduling(self, verbose=True):
+        """Priority Scheduling (Preemptive)"""
+        if verbose:
+            print("\nPriority Scheduling (Preemptive):")
+            print("-" * 50)
+        
+        # Select process with highest priority (lower number = higher priority)
+        self._run_preemptive(key=lambda x: x.priority)
+        
+        if verbose:
+            self.print_schedule()
+    
+    def mlfq(self, time_quanta=(2, 4, 8), boost_interval=50, verbose=True):
+        """Multilevel Feedback Queue Scheduling
+        
+        Level 0 is the highest priority and each level has its own quantum.
+        New arrivals enter level 0, a process that uses up its quantum is
+        demoted one level, and every ``boost_interval`` time units all
+        processes are moved back to level 0 (0 or None disables the boost).
+        Arrivals preempt a process running below level 0.
+        """
+        if not time_quanta or min(time_quanta) <= 0:
+            raise ValueError("time_quanta must be a non-empty sequence of positive integers")
+        
+        if verbose:
+            print(f"\nMultilevel Feedback Queue Scheduling (Quanta: {list(time_quanta)}, Boost: {boost_interval}):")
+            print("-" * 50)
         
         self.current_time = 0
         self.completed_processes = []
-        self.gantt_chart = []
-        remaining_processes = self.processes.copy()
+        self.gantt_chart = GanttStore()
         
-        while remaining_processes:
-            # Get processes that have arrived
-            available_processes = [p for p in remaining_processes if p.arrival_time <= self.current_time]
+        for process in self.processes:
+            process.remaining_time = process.burst_time
+            process.start_time = -1
+        
+        num_levels = len(time_quanta)
+        queues = [deque() for _ in range(num_levels)]
+        nonempty = 0  # bit l set <=> queues[l] is non-empty, so the top level is found in O(1)
+        level = [0] * len(self.processes)
+        used = [0] * len(self.processes)  # time consumed of the current level's quantum
+        
+        order = sorted(range(len(self.processes)), key=lambda i: self.processes[i].arrival_time)
+        arrivals = [self.processes[i].arrival_time for i in order]
+        arrivals.append(float('inf'))  # sentinel, never admitted
+        cursor = 0
+        total = len(order)
+        next_boost = boost_interval if boost_interval else float('inf')
+        current = None
+        
+        def enqueue(i):
+            nonlocal nonempty
+            queues[level[i]].append(i)
+            nonempty |= 1 << level[i]
+        
+        def dequeue():
+            nonlocal nonempty
+            top = (nonempty & -nonempty).bit_length() - 1
+            i = queues[top].popleft()
+            if not queues[top]:
+                nonempty &= ~(1 << top)
+            return i
+        
+        def admit_arrivals():
+            nonlocal cursor
+            while arrivals[cursor] <= self.current_time:
+                enqueue(order[cursor])
+                cursor += 1
+        
+        while cursor < total or nonempty or current is not None:
+            admit_arrivals()
             
-            if not available_processes:
-                # No processes available, advance time
-                self.current_time += 1
-                continue
+            if self.current_time >= next_boost:
+                # Priority boost: every queued process moves back to level 0
+                for lvl in range(1, num_levels):
+                    for i in queues[lvl]:
+                        level[i] = 0
+                        used[i] = 0
+                    queues[0].extend(queues[lvl])
+                    queues[lvl].clear()
+                if queues[0]:
+                    nonempty = 1
+                if current is not None:
+                    level[current] = 0
+                    used[current] = 0
+                next_boost = (self.current_time // boost_interval + 1) * boost_interval
+            
+            if current is None:
+                if not nonempty:
+                    # CPU idle, jump to the next arrival
+                    self.current_time = arrivals[cursor]
+                    continue
+                current = dequeue()
+            elif nonempty & ((1 << level[current]) - 1):
+                # A higher level has work: preempt, keeping the quantum already used
+                enqueue(current)
+                current = dequeue()
             
-            # Select process with highest priority (lower number = higher priority)
-            next_process = min(available_processes, key=lambda x: x.priority)
-            remaining_processes.remove(next_process)
+            process = self.processes[current]
+            lvl = level[current]
+            if process.start_time == -1:
+                process.start_time = self.current_time
+            process.state = ProcessState.RUNNING
             
-            next_process.start_time = self.current_time
-            next_process.state = ProcessState.RUNNING
+            # Run until completion, quantum expiry, the next boost, or an arrival that would preempt
+            start_time = self.current_time
+            end_time = min(start_time + process.remaining_time,
+                           start_time + time_quanta[lvl] - used[current],
+                           next_boost)
+            if lvl > 0:
+                end_time = min(end_time, arrivals[cursor])
+            self.current_time = end_time
+            process.remaining_time -= end_time - start_time
+            used[current] += end_time - start_time
             
-            # Execute process
-            self.gantt_chart.append((next_process.pid, self.current_time, self.current_time + next_process.burst_time))
-            self.current_time += next_process.burst_time
+            self.gantt_chart.append((process.pid, start_time, end_time))
             
-            next_process.completion_time = self.current_time
-            next_process.state = ProcessState.COMPLETED
-            self.completed_processes.append(next_process)
+            # Arrivals during the slice queue up ahead of a demoted process
+            admit_arrivals()
+            
+            if process.remaining_time == 0:
+                process.completion_time = self.current_time
+                process.state = ProcessState.COMPLETED
+                self.completed_processes.append(process)
+                current = None
+            elif used[current] == time_quanta[lvl]:
+                # Quantum expired: demote one level (the last level is round robin)
+                level[current] = min(lvl + 1, num_levels - 1)
+                used[current] = 0
+                process.state = ProcessState.READY
+                enqueue(current)
+                current = None
         
-        self.print_schedule()
+        if verbose:
+            self.print_schedule()
+            print(f"Average Response Time: {self.metrics()['avg_response']:.2f}")
     
-    def round_robin(self, time_quantum=2):
-        """Round Robin Scheduling"""
-        print(f"\nRound Robin Scheduling (Time Quantum: {time_quantum}):")
-        print("-" * 50)
+    def cfs(self, target_latency=20, min_granularity=1, verbose=True):
+        """Completely Fair Scheduling (virtual runtime)
+        
+        Process.priority sets the weight: priority 1 gets NICE_0_WEIGHT and
+        each step down the scale gets 1.25x less CPU, like Linux nice levels.
+        Runnable processes are kept in a heap keyed by virtual runtime (the
+        kernel uses a red-black tree, but only its leftmost node is ever
+        needed), so picking the next process costs O(log n). Each pick runs
+        for its weighted share of ``target_latency``, never less than
+        ``min_granularity``.
+        """
+        if verbose:
+            print(f"\nCompletely Fair Scheduling (Target Latency: {target_latency}):")
+            print("-" * 50)
         
         self.current_time = 0
         self.completed_processes = []
-        self.gantt_chart = []
-        ready_queue = []
-        remaining_processes = self.processes.copy()
+        self.gantt_chart = GanttStore()
         
-        # Reset remaining times
-        for process in remaining_processes:
+        for process in self.processes:
             process.remaining_time = process.burst_time
+            process.start_time = -1
         
-        while remaining_processes or ready_queue:
-            # Add processes that have arrived to ready queue
-            new_arrivals = [p for p in remaining_processes if p.arrival_time <= self.current_time]
-            for process in new_arrivals:
-                ready_queue.append(process)
-                remaining_processes.remove(process)
+        weights = [max(1, int(NICE_0_WEIGHT / 1.25 ** (p.priority - 1))) for p in self.processes]
+        vruntime = [0.0] * len(self.processes)
+        run_tree = []  # heap of (vruntime, submission index)
+        total_weight = 0  # sum of weights of all runnable processes
+        min_vruntime = 0.0
+        
+        order = sorted(range(len(self.processes)), key=lambda i: self.processes[i].arrival_time)
+        arrivals = [self.processes[i].arrival_time for i in order]
+        arrivals.append(float('inf'))  # sentinel, never admitted
+        cursor = 0
+        total = len(order)
+        
+        while cursor < total or run_tree:
+            # New processes start at min_vruntime so they cannot starve the others
+            while arrivals[cursor] <= self.current_time:
+                i = order[cursor]
+                vruntime[i] = min_vruntime
+                heapq.heappush(run_tree, (min_vruntime, i))
+                total_weight += weights[i]
+                cursor += 1
             
-            if not ready_queue:
-                self.current_time += 1
+            if not run_tree:
+                # CPU idle, jump to the next arrival
+                self.current_time = arrivals[cursor]
                 continue
             
-            # Get next process from ready queue
-            current_process = ready_queue.pop(0)
+            i = heapq.heappop(run_tree)[1]
+            process = self.processes[i]
+            if process.start_time == -1:
+                process.start_time = self.current_time
+            process.state = ProcessState.RUNNING
             
-            if current_process.start_time == -1:
-                current_process.start_time = self.current_time
+            time_slice = max(min_granularity, target_latency * weights[i] // total_weight)
+            run_time = min(time_slice, process.remaining_time)
+            start_time = self.current_time
+            self.current_time += run_time
+            process.remaining_time -= run_time
+            vruntime[i] += run_time * NICE_0_WEIGHT / weights[i]
             
-            current_process.state = ProcessState.RUNNING
+            self.gantt_chart.append((process.pid, start_time, self.current_time))
             
-            # Execute for time quantum or remaining time
-            execution_time = min(time_quantum, current_process.remaining_time)
-            start_time = self.current_time
-            self.current_time += execution_time
-            current_process.remaining_time -= execution_time
+            if process.remaining_time == 0:
+                process.completion_time = self.current_time
+                process.state = ProcessState.COMPLETED
+                self.completed_processes.append(process)
+                total_weight -= weights[i]
+            else:
+                process.state = ProcessState.READY
+                heapq.heappush(run_tree, (vruntime[i], i))
+            
+            # min_vruntime only moves forward
+            leftmost = run_tree[0][0] if run_tree else vruntime[i]
+            min_vruntime = max(min_vruntime, leftmost)
+        
+        if verbose:
+            self.print_schedule()
+    
+    def lottery(self, time_quantum=1, seed=None, verbose=True):
+        """Lottery Scheduling (proportional share)
+        
+        Process.priority is used as the ticket count. Every quantum one ticket
+        is drawn from all runnable processes, looked up in a Fenwick tree over
+        ticket counts in O(log n).
+        """
+        if verbose:
+            print(f"\nLottery Scheduling (Time Quantum: {time_quantum}):")
+            print("-" * 50)
+        
+        rng = random.Random(seed)
+        
+        def pick(tree, total_tickets):
+            return tree.find(rng.randrange(total_tickets))
+        
+        self._run_proportional_share(time_quantum, pick)
+        
+        if verbose:
+            self.print_schedule()
+            self.print_share_report()
+    
+    def stride(self, time_quantum=1, verbose=True):
+        """Stride Scheduling (deterministic proportional share)
+        
+        Process.priority is used as the ticket count; each process advances
+        its pass by STRIDE1 / tickets per unit of CPU time and the lowest pass
+        runs next, taken from a heap.
+        """
+        if verbose:
+            print(f"\nStride Scheduling (Time Quantum: {time_quantum}):")
+            print("-" * 50)
+        
+        self._run_proportional_share(time_quantum, None)
+        
+        if verbose:
+            self.print_schedule()
+            self.print_share_report()
+    
+    def _run_proportional_share(self, time_quantum, pick):
+        """Engine shared by lottery (``pick`` draws a ticket) and stride
+        (``pick`` is None and a pass-value heap decides).
+        
+        Target shares are tracked with a global "time per ticket" counter:
+        over a slice of length d with T runnable tickets it grows by d / T, so
+        a process holding t tickets is owed t times the counter's growth
+        while it is runnable. That keeps the accounting O(1) per slice.
+        """
+        self.current_time = 0
+        self.completed_processes = []
+        self.gantt_chart = GanttStore()
+        self.share_report = []
+        
+        for process in self.processes:
+            process.remaining_time = process.burst_time
+            process.start_time = -1
+        
+        order = sorted(range(len(self.processes)), key=lambda i: self.processes[i].arrival_time)
+        arrivals = [self.processes[i].arrival_time for i in order]
+        arrivals.append(float('inf'))  # sentinel, never admitted
+        tickets = [max(1, self.processes[i].priority) for i in order]  # by arrival position
+        cursor = 0
+        total = len(order)
+        
+        tree = _FenwickTree(total)
+        pass_heap = []  # stride: (pass, arrival position)
+        passes = [0.0] * total
+        total_tickets = 0
+        runnable = 0
+        time_per_ticket = 0.0
+        joined_at = [0.0] * total
+        
+        while cursor < total or runnable:
+            while arrivals[cursor] <= self.current_time:
+                k = cursor
+                total_tickets += tickets[k]
+                runnable += 1
+                joined_at[k] = time_per_ticket
+                if pick is None:
+                    # Newcomers start at the current minimum pass so they cannot monopolize the CPU
+                    passes[k] = pass_heap[0][0] if pass_heap else 0.0
+                    heapq.heappush(pass_heap, (passes[k], k))
+                else:
+                    tree.add(k, tickets[k])
+                cursor += 1
             
-            self.gantt_chart.append((current_process.pid, start_time, self.current_time))
+            if not runnable:
+                # CPU idle, jump to the next arrival
+                self.current_time = arrivals[cursor]
+                continue
             
-            # Add new arrivals during execution
-            new_arrivals = [p for p in remaining_processes if p.arrival_time <= self.current_time]
-            for process in new_arrivals:
-                ready_queue.append(process)
-                remaining_processes.remove(process)
+            if pick is None:
+                k = heapq.heappop(pass_heap)[1]
+            else:
+                k = pick(tree, total_tickets)
+            process = self.processes[order[k]]
+            if process.start_time == -1:
+                process.start_time = self.current_time
+            process.state = ProcessState.RUNNING
             
-            if current_process.remaining_time > 0:
-                # Process not finished, add back to ready queue
-                ready_queue.append(current_process)
-                current_process.state = ProcessState.READY
+            run_time = min(time_quantum, process.remaining_time)
+            start_time = self.current_time
+            self.current_time += run_time
+            process.remaining_time -= run_time
+            time_per_ticket += run_time / total_tickets
+            self.gantt_chart.append((process.pid, start_time, self.current_time))
+            
+            if process.remaining_time == 0:
+                process.completion_time = self.current_time
+                process.state = ProcessState.COMPLETED
+                self.completed_processes.append(process)
+                target = tickets[k] * (time_per_ticket - joined_at[k])
+                self.share_report.append({
+                    'pid': process.pid,
+                    'tickets': tickets[k],
+                    'target_cpu': target,
+                    'actual_cpu': process.burst_time,
+                    'ratio': process.burst_time / target if target else 0.0,
+                })
+                total_tickets -= tickets[k]
+                runnable -= 1
+                if pick is not None:
+                    tree.add(k, -tickets[k])
             else:
-                # Process completed
-                current_process.completion_time = self.current_time
-                current_process.state = ProcessState.COMPLETED
-                self.completed_processes.append(current_process)
+                process.state = ProcessState.READY
+                if pick is None:
+                    passes[k] += STRIDE1 / tickets[k] * run_time
+                    heapq.heappush(pass_heap, (passes[k], k))
+    
+    def print_share_report(self):
+        """Compare each process's CPU time with its proportional-share target"""
+        if not self.share_report:
+            return
+        print("\nProportional Share (target = tickets x time-per-ticket while runnable):")
+        print("PID | Tickets | Target CPU | Actual CPU | Actual/Target")
+        print("-" * 60)
+        for row in sorted(self.share_report, key=lambda r: r['pid']):
+            print(f"P{row['pid']:2d} | {row['tickets']:7d} | {row['target_cpu']:10.2f} | "
+                  f"{row['actual_cpu']:10d} | {row['ratio']:13.2f}")
+        error = sum(abs(row['ratio'] - 1) for row in self.share_report) / len(self.share_report)
+        print("-" * 60)
+        print(f"Mean Share Error: {error * 100:.2f}%")
+    
+    def metrics(self):
+        """Summary statistics of the last run as a dict"""
+        num_processes = len(self.completed_processes)
+        if num_processes == 0:
+            return {}
+        
+        table = self.processes
+        if isinstance(table, ProcessTable) and num_processes == len(table):
+            # Every row finished: sum the columns directly instead of going through views
+            total_arrival = sum(table.arrival)
+            total_turnaround = sum(table.completion) - total_arrival
+            total_waiting = total_turnaround - sum(table.burst)
+            total_response = sum(table.start) - total_arrival
+            makespan = max(table.completion) - min(table.arrival)
+        else:
+            total_turnaround = sum(p.turnaround_time for p in self.completed_processes)
+            total_waiting = sum(p.waiting_time for p in self.completed_processes)
+            total_response = sum(p.start_time - p.arrival_time for p in self.completed_processes)
+            first_arrival = min(p.arrival_time for p in self.completed_processes)
+            makespan = max(p.completion_time for p in self.completed_processes) - first_arrival
+        context_switches = self.gantt_chart.context_switches()
+        
+        return {
+            'processes': num_processes,
+            'avg_turnaround': total_turnaround / num_processes,
+            'avg_waiting': total_waiting / num_processes,
+            'avg_response': total_response / num_processes,
+            'makespan': makespan,
+            'throughput': num_processes / makespan if makespan else 0.0,
+            'context_switches': context_switches,
+        }
+    
+    def smp_schedule(self, num_cores=4, algorithm='fcfs', time_quantum=2, work_stealing=True, verbose=True):
+        """Multi-core (SMP) Scheduling with per-core run queues
+        
+        ``algorithm`` is one of 'fcfs', 'sjf', 'priority' or 'rr' and is
+        applied to each core's own run queue. Arrivals are balanced onto the
+        core with the fewest assigned processes; with ``work_stealing`` a
+        core that runs dry takes the newest queued process from the most
+        loaded core. Fills ``core_gantt`` with one timeline per core and
+        ``smp_stats`` with makespan and utilization.
+        """
+        if algorithm not in ('fcfs', 'sjf', 'priority', 'rr'):
+            raise ValueError(f"Unknown algorithm '{algorithm}', expected fcfs, sjf, priority or rr")
+        if num_cores < 1:
+            raise ValueError("num_cores must be at least 1")
+        
+        if verbose:
+            print(f"\nSMP Scheduling ({algorithm.upper()}, {num_cores} cores, "
+                  f"work stealing {'on' if work_stealing else 'off'}):")
+            print("-" * 50)
+        
+        self.current_time = 0
+        self.completed_processes = []
+        self.gantt_chart = GanttStore()
+        self.core_gantt = [GanttStore() for _ in range(num_cores)]
+        
+        for process in self.processes:
+            process.remaining_time = process.burst_time
+            process.start_time = -1
+        
+        # FCFS and RR queues are FIFO deques, SJF and priority queues are heaps.
+        # Both support pop() from the tail, which is what a thief takes.
+        use_heap = algorithm in ('sjf', 'priority')
+        if algorithm == 'sjf':
+            key = lambda i: self.processes[i].burst_time
+        else:
+            key = lambda i: self.processes[i].priority
+        run_queues = [[] if use_heap else deque() for _ in range(num_cores)]
+        
+        def enqueue(core, i):
+            if use_heap:
+                heapq.heappush(run_queues[core], (key(i), i))
+            else:
+                run_queues[core].append(i)
+        
+        def dequeue(core):
+            if use_heap:
+                return heapq.heappop(run_queues[core])[1]
+            return run_queues[core].popleft()
+        
+        def steal_from(core):
+            entry = run_queues[core].pop()
+            return entry[1] if use_heap else entry
+        
+        load = [0] * num_cores            # processes assigned to each core (queued + running)
+        load_heap = [(0, core) for core in range(num_cores)]  # lazy min-heap over load
+        running = [None] * num_cores
+        busy_time = [0] * num_cores
+        idle_cores = set(range(num_cores))
+        slice_ends = []                   # heap of (end time, core) for running slices
+        queued = 0
+        steals = 0
+        
+        def change_load(core, delta):
+            load[core] += delta
+            heapq.heappush(load_heap, (load[core], core))
         
-        self.print_schedule()
+        def least_loaded_core():
+            # Discard stale entries left behind by earlier load changes
+            while load_heap[0][0] != load[load_heap[0][1]]:
+                heapq.heappop(load_heap)
+            return load_heap[0][1]
+        
+        order = sorted(range(len(self.processes)), key=lambda i: self.processes[i].arrival_time)
+        arrivals = [self.processes[i].arrival_time for i in order]
+        arrivals.append(float('inf'))  # sentinel, never admitted
+        cursor = 0
+        total = len(order)
+        
+        while cursor < total or slice_ends:
+            if algorithm == 'rr' and slice_ends and not idle_cores:
+                # As in round_robin(), arrivals during a slice are admitted together when it ends
+                self.current_time = slice_ends[0][0]
+            else:
+                self.current_time = min(arrivals[cursor], slice_ends[0][0] if slice_ends else float('inf'))
+            
+            # Retire slices that end now
+            preempted = []
+            woken = []  # idle cores that may have work in their own queue
+            while slice_ends and slice_ends[0][0] == self.current_time:
+                core = heapq.heappop(slice_ends)[1]
+                i = running[core]
+                running[core] = None
+                idle_cores.add(core)
+                woken.append(core)
+                process = self.processes[i]
+                if process.remaining_time == 0:
+                    process.completion_time = self.current_time
+                    process.state = ProcessState.COMPLETED
+                    self.completed_processes.append(process)
+                    change_load(core, -1)
+                else:
+                    process.state = ProcessState.READY
+                    preempted.append((core, i))
+            
+            # Balance new arrivals onto the least loaded core
+            first = cursor
+            while arrivals[cursor] <= self.current_time:
+                cursor += 1
+            batch = sorted(order[first:cursor]) if algorithm == 'rr' else order[first:cursor]
+            for i in batch:
+                core = least_loaded_core()
+                enqueue(core, i)
+                change_load(core, 1)
+                woken.append(core)
+                queued += 1
+            
+            # As in single-core RR, arrivals queue ahead of the preempted process
+            for core, i in preempted:
+                enqueue(core, i)
+                queued += 1
+            
+            if not queued:
+                continue
+            
+            # Idle cores first drain their own run queue ...
+            dispatch = []
+            for core in woken:
+                if core in idle_cores and run_queues[core]:
+                    idle_cores.discard(core)
+                    dispatch.append((core, dequeue(core)))
+                    queued -= 1
+            
+            # ... then any core still idle steals from the most loaded queue
+            if work_stealing and queued and idle_cores:
+                for core in sorted(idle_cores):
+                    victim = max(range(num_cores), key=lambda c: len(run_queues[c]))
+                    if not run_queues[victim]:
+                        break
+                    idle_cores.discard(core)
+                    dispatch.append((core, steal_from(victim)))
+                    change_load(victim, -1)
+                    change_load(core, 1)
+                    queued -= 1
+                    steals += 1
+            
+            for core, i in dispatch:
+                process = self.processes[i]
+                if process.start_time == -1:
+                    process.start_time = self.current_time
+                process.state = ProcessState.RUNNING
+                run_time = min(time_quantum, process.remaining_time) if algorithm == 'rr' else process.remaining_time
+                end_time = self.current_time + run_time
+                process.remaining_time -= run_time
+                running[core] = i
+                busy_time[core] += run_time
+                heapq.heappush(slice_ends, (end_time, core))
+                
+                self.core_gantt[core].append((process.pid, self.current_time, end_time))
+        
+        if self.completed_processes:
+            first_arrival = min(p.arrival_time for p in self.completed_processes)
+            makespan = max(p.completion_time for p in self.completed_processes) - first_arrival
+        else:
+            makespan = 0
+        self.smp_stats = {
+            'cores': num_cores,
+            'makespan': makespan,
+            'utilization': sum(busy_time) / (num_cores * makespan) if makespan else 0.0,
+            'core_utilization': [busy / makespan if makespan else 0.0 for busy in busy_time],
+            'steals': steals,
+        }
+        
+        if verbose:
+            self.print_smp_schedule()
     
     def print_schedule(self):
         """Print scheduling results and statistics"""
         # Print Gantt Chart
         print("Gantt Chart:")
-        gantt_str = ""
-        for pid, start, end in self.gantt_chart:
-            gantt_str += f"P{pid}[{start}-{end}] "
-        print(gantt_str)
+        self.gantt_chart.render()
+        print()
         
+        self._print_process_table()
+    
+    def print_smp_schedule(self):
+        """Print per-core timelines and aggregate SMP statistics"""
+        print("Gantt Chart (per core):")
+        for core, timeline in enumerate(self.core_gantt):
+            print(f"CPU{core}: ", end="")
+            timeline.render()
+            print()
+        
+        self._print_process_table()
+        
+        if self.smp_stats:
+            print(f"Makespan: {self.smp_stats['makespan']}")
+            print(f"CPU Utilization: {self.smp_stats['utilization'] * 100:.2f}%")
+            print(f"Work Steals: {self.smp_stats['steals']}")
+    
+    def _print_process_table(self):
         # Print process table
         print("\nProcess Execution Details:")
         print("PID | Arrival | Burst | Priority | Start | Complete | Turnaround | Waiting")
@@ -262,24 +1372,124 @@ class CPUScheduler:
         for process in self.processes:
             print(f"P{process.pid:2d} | {process.arrival_time:7d} | {process.burst_time:5d} | {process.priority:8d}")
         
-        # Run all algorithms
-        original_processes = [Process(p.pid, p.arrival_time, p.burst_time, p.priority) for p in self.processes]
-        
+        # Run all algorithms on the same workload, resetting results in between
         # FCFS
-        self.processes = [Process(p.pid, p.arrival_time, p.burst_time, p.priority) for p in original_processes]
         self.fcfs()
         
         # SJF
-        self.processes = [Process(p.pid, p.arrival_time, p.burst_time, p.priority) for p in original_processes]
+        self.reset_processes()
         self.sjf()
         
         # Priority
-        self.processes = [Process(p.pid, p.arrival_time, p.burst_time, p.priority) for p in original_processes]
+        self.reset_processes()
         self.priority_scheduling()
         
         # Round Robin
-        self.processes = [Process(p.pid, p.arrival_time, p.burst_time, p.priority) for p in original_processes]
+        self.reset_processes()
         self.round_robin(time_quantum=2)
+    
+    def compare_algorithms_parallel(self, time_quantum=2, max_workers=None):
+        """Run FCFS, SJF, priority and RR in parallel worker processes
+        
+        The workload columns are copied once into a shared memory block that
+        every worker attaches to, instead of pickling the workload per task.
+        Prints one comparison table and returns {algorithm: metrics}.
+        """
+        table = self.processes
+        if not isinstance(table, ProcessTable):
+            table = ProcessTable.from_processes(self.processes)
+        
+        block = _share_workload(table)
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers or len(ALGORITHMS)) as pool:
+                futures = {name: pool.submit(_run_shared_workload, block.name, len(table), name, time_quantum)
+                           for name in ALGORITHMS}
+                results = {name: future.result() for name, future in futures.items()}
+        finally:
+            block.close()
+            block.unlink()
+        
+        print("\n" + "="*70)
+        print(f"CPU SCHEDULING ALGORITHMS COMPARISON ({len(table)} processes)")
+        print("="*70)
+        print("Algorithm | Avg Turnaround | Avg Waiting | Avg Response | Makespan | Switches | Run Time (s)")
+        print("-" * 90)
+        for name, stats in results.items():
+            if not stats:
+                continue
+            print(f"{name.upper():9s} | {stats['avg_turnaround']:14.2f} | {stats['avg_waiting']:11.2f} | "
+                  f"{stats['avg_response']:12.2f} | {stats['makespan']:8d} | {stats['context_switches']:8d} | "
+                  f"{stats['run_time']:12.3f}")
+        return results
+    
+    def compare_core_scaling(self, core_counts=(1, 2, 4, 8, 16, 32, 64), time_quantum=2, work_stealing=True):
+        """Run FCFS, SJF, priority and RR on 1..N cores over the current workload"""
+        print("\n" + "="*70)
+        print("SMP SCALING COMPARISON")
+        print("="*70)
+        print("Algorithm | Cores | Makespan | Utilization | Avg Turnaround | Avg Waiting")
+        print("-" * 75)
+        
+        for algorithm in ('fcfs', 'sjf', 'priority', 'rr'):
+            for num_cores in core_counts:
+                self.smp_schedule(num_cores, algorithm, time_quantum, work_stealing, verbose=False)
+                stats = self.metrics()
+                if not stats:
+                    continue
+                print(f"{algorithm.upper():9s} | {num_cores:5d} | {self.smp_stats['makespan']:8d} | "
+                      f"{self.smp_stats['utilization'] * 100:10.2f}% | {stats['avg_turnaround']:14.2f} | {stats['avg_waiting']:11.2f}")
+
+# Algorithms run by compare_algorithms_parallel(), keyed by short name
+ALGORITHMS = {
+    'fcfs': lambda scheduler, quantum: scheduler.fcfs(verbose=False),
+    'sjf': lambda scheduler, quantum: scheduler.sjf(verbose=False),
+    'priority': lambda scheduler, quantum: scheduler.priority_scheduling(verbose=False),
+    'rr': lambda scheduler, quantum: scheduler.round_robin(time_quantum=quantum, verbose=False),
+}
+
+# Columns copied into shared memory, in layout order
+SHARED_COLUMNS = ('pid', 'arrival', 'burst', 'priority')
+
+def _share_workload(table):
+    """Copy the input columns of a ProcessTable into a new shared memory block"""
+    columns = [getattr(table, name) for name in SHARED_COLUMNS]
+    size = sum(column.itemsize * len(column) for column in columns)
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    offset = 0
+    for column in columns:
+        data = column.tobytes()
+        block.buf[offset:offset + len(data)] = data
+        offset += len(data)
+    return block
+
+def _run_shared_workload(block_name, count, algorithm, time_quantum):
+    """Worker: attach to the shared workload, run one algorithm, return its metrics"""
+    block = shared_memory.SharedMemory(name=block_name)
+    try:
+        table = ProcessTable()
+        offset = 0
+        for name in SHARED_COLUMNS:
+            column = getattr(table, name)
+            size = column.itemsize * count
+            column.frombytes(block.buf[offset:offset + size])
+            offset += size
+    finally:
+        block.close()
+    table.remaining.extend(table.burst)
+    table.start.extend(array('q', [-1]) * count)
+    table.completion.extend(array('q', [-1]) * count)
+    table.state.frombytes(bytes([CODE_BY_STATE[ProcessState.READY]]) * count)
+    
+    scheduler = CPUScheduler()
+    scheduler.processes = table
+    started = time.perf_counter()
+    ALGORITHMS[algorithm](scheduler, time_quantum)
+    elapsed = time.perf_counter() - started
+    stats = scheduler.metrics()
+    if stats:
+        # An empty workload has no metrics; keep {} so callers can skip it
+        stats['run_time'] = elapsed
+    return stats
 
 def cpu_scheduling_demo():
     """Main function for CPU scheduling demonstration"""
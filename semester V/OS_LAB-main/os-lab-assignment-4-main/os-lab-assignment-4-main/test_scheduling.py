@@ -0,0 +1,27 @@
+"""Regression checks for the CPU scheduling simulators (run with pytest)"""
+
+import random
+
+from online_scheduler import OnlineScheduler
+from task5_cpu_scheduling import ALGORITHMS, CPUScheduler, Process
+
+def test_parallel_comparison_of_empty_workload(capsys):
+    results = CPUScheduler().compare_algorithms_parallel(max_workers=1)
+    assert results == {name: {} for name in ALGORITHMS}
+    # Only the table header is printed
+    assert "FCFS |" not in capsys.readouterr().out
+
+def test_replay_matches_batch_round_robin():
+    rng = random.Random(7)
+    rows, arrival = [], 0
+    for pid in range(1, 2001):
+        arrival += rng.randint(0, 6)
+        rows.append((pid, arrival, rng.randint(1, 10), rng.randint(1, 5)))
+    completed = OnlineScheduler('rr', time_quantum=2).replay(rows)
+    batch = CPUScheduler()
+    for row in rows:
+        batch.add_process(Process(*row))
+    batch.round_robin(time_quantum=2, verbose=False)
+    assert len(completed) == len(rows)
+    assert ({p.pid: (p.start_time, p.completion_time) for p in completed}
+            == {p.pid: (p.start_time, p.completion_time) for p in batch.processes})
@@ -0,0 +1,104 @@
+"""
+Streaming workload traces for CPUScheduler
+
+Two on-disk formats are supported:
+
+* CSV with one process per line: ``pid,arrival,burst[,priority]``. An
+  optional header line is skipped and priority defaults to 1.
+* A fixed-width binary format: a 16-byte header (magic ``PTRC``, version,
+  record size, record count) followed by little-endian records of
+  int32 pid, int64 arrival, int32 burst, int32 priority.
+
+Both readers are generators that read the file in chunks, and
+``load_trace()`` feeds them straight into a ProcessTable, so traces with
+tens of millions of entries never exist as Python objects all at once.
+"""
+
+import os
+import struct
+
+from task5_cpu_scheduling import ProcessTable
+
+TRACE_MAGIC = b'PTRC'
+TRACE_VERSION = 1
+HEADER = struct.Struct('<4sHHQ')
+RECORD = struct.Struct('<iqii')
+
+def iter_csv_trace(path, chunk_size=1 << 20):
+    """Yield (pid, arrival, burst, priority) tuples from a CSV trace"""
+    with open(path, 'rb', buffering=chunk_size) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith(b'#'):
+                continue
+            fields = line.split(b',', 3)
+            try:
+                pid = int(fields[0])
+            except ValueError:
+                if line_number == 1:
+                    continue  # header row
+                raise ValueError(f"{path}:{line_number}: invalid pid {fields[0]!r}")
+            if len(fields) < 3:
+                raise ValueError(f"{path}:{line_number}: expected pid,arrival,burst[,priority]")
+            priority = int(fields[3]) if len(fields) > 3 else 1
+            yield pid, int(fields[1]), int(fields[2]), priority
+
+def iter_binary_trace(path, chunk_records=65536):
+    """Yield (pid, arrival, burst, priority) tuples from a binary trace"""
+    with open(path, 'rb') as f:
+        magic, version, record_size, count = HEADER.unpack(f.read(HEADER.size))
+        if magic != TRACE_MAGIC:
+            raise ValueError(f"{path}: not a binary process trace")
+        if version != TRACE_VERSION or record_size != RECORD.size:
+            raise ValueError(f"{path}: unsupported trace version {version} (record size {record_size})")
+        
+        remaining = count
+        while remaining:
+            records = min(remaining, chunk_records)
+            buf = f.read(records * RECORD.size)
+            if len(buf) != records * RECORD.size:
+                raise ValueError(f"{path}: truncated trace, {remaining} records missing")
+            yield from RECORD.iter_unpack(buf)
+            remaining -= records
+
+def write_binary_trace(path, rows, chunk_records=65536):
+    """Write (pid, arrival, burst, priority) tuples as a binary trace
+    
+    ``rows`` may be any iterable; it is written in chunks and the record
+    count in the header is patched in at the end. Returns the count.
+    """
+    count = 0
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(TRACE_MAGIC, TRACE_VERSION, RECORD.size, 0))
+        buf = bytearray()
+        for row in rows:
+            buf += RECORD.pack(*row)
+            count += 1
+            if count % chunk_records == 0:
+                f.write(buf)
+                buf.clear()
+        f.write(buf)
+        f.seek(0)
+        f.write(HEADER.pack(TRACE_MAGIC, TRACE_VERSION, RECORD.size, count))
+    return count
+
+def iter_trace(path):
+    """Pick the reader by content: binary traces start with the magic bytes"""
+    with open(path, 'rb') as f:
+        is_binary = f.read(len(TRACE_MAGIC)) == TRACE_MAGIC
+    return iter_binary_trace(path) if is_binary else iter_csv_trace(path)
+
+def load_trace(path, scheduler=None):
+    """Stream a CSV or binary trace into a new ProcessTable
+    
+    If ``scheduler`` is given the table becomes its workload, ready for
+    fcfs(), sjf(), priority_scheduling() or round_robin().
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Trace file '{path}' not found")
+    
+    table = ProcessTable()
+    table.extend_rows(iter_trace(path))
+    if scheduler is not None:
+        scheduler.processes = table
+    return table